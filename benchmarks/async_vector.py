@@ -0,0 +1,64 @@
+"""
+Env steps/s of `SubprocVecEnv` stepped synchronously vs asynchronously with
+`send()` / `recv(min_batch)`, which only waits for the first `min_batch` envs.
+
+    python -m benchmarks.async_vector --workers 16 --min-batch 8 --steps 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open.vector import EnvDescriptor, SubprocVecEnv
+
+from .common import print_table
+
+
+def run_sync(vec_env, n_steps, rng):
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        vec_env.step(rng.uniform(-1, 1, (vec_env.num_envs, 4)))
+    return n_steps * vec_env.num_envs / (time.perf_counter() - start)
+
+
+def run_async(vec_env, n_steps, min_batch, rng):
+    """Steps until `n_steps * num_envs` env steps are received, returning
+    steps/s and the mean batch size"""
+    total, batches = n_steps * vec_env.num_envs, []
+    start = time.perf_counter()
+    vec_env.send(rng.uniform(-1, 1, (vec_env.num_envs, 4)))
+    received = 0
+    while received < total:
+        env_ids = vec_env.recv(min_batch)[0]
+        received += len(env_ids)
+        batches.append(len(env_ids))
+        vec_env.send(rng.uniform(-1, 1, (len(env_ids), 4)), env_ids)
+    elapsed = time.perf_counter() - start
+    vec_env.recv(vec_env.num_envs)
+    return received / elapsed, np.mean(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--min-batch', type=int, nargs='+', default=[4, 8])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--max-episode-length', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vec_env = SubprocVecEnv([EnvDescriptor(seed, args.max_episode_length)
+                             for seed in range(args.workers)])
+    vec_env.reset()
+    rows = [('sync', '{:.0f}'.format(run_sync(vec_env, args.steps, rng)), args.workers)]
+    for min_batch in args.min_batch:
+        steps_per_sec, batch = run_async(vec_env, args.steps, min_batch, rng)
+        rows.append(('async, min_batch={}'.format(min_batch),
+                     '{:.0f}'.format(steps_per_sec), '{:.1f}'.format(batch)))
+    vec_env.close()
+    print_table(('mode', 'env steps/s', 'mean batch'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import os
+import time
+
+import numpy as np
+
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+from metaworld_door_open.reporting import print_table
+
+
+def rollout(env, n_steps, policy=None):
+    """Runs the scripted policy for `n_steps` or until done
+
+    Returns:
+        np.ndarray: (T + 1, obs_dim) observations, including the reset one
+        bool: whether `success` was reported at any step
+        float: wall time spent in `env.step`
+    """
+    policy = SawyerDoorOpenV2Policy() if policy is None else policy
+    obs = env.reset()
+    observations = [obs]
+    success = False
+    step_time = 0.
+    for _ in range(n_steps):
+        action = policy.get_action(obs)
+        start = time.perf_counter()
+        obs, _, done, info = env.step(action)
+        step_time += time.perf_counter() - start
+        observations.append(obs)
+        success = success or bool(info['success'])
+        if done:
+            break
+    return np.stack(observations), success, step_time
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux)"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
@@ -0,0 +1,45 @@
+"""
+Construction time of many envs, sequentially and with `make_dooropen_envs`
+(thread pool), and a check that every env gets the same door position in
+both cases.
+
+    python -m benchmarks.construction --envs 256 --workers 1 8 32
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_envs
+
+from .common import print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--envs', type=int, default=256)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--max-episode-length', type=int, default=200)
+    args = parser.parse_args()
+
+    seeds = list(range(args.envs))
+    reference = None
+    rows = []
+    for workers in args.workers:
+        start = time.perf_counter()
+        envs = make_dooropen_envs(seeds, workers, max_episode_length=args.max_episode_length)
+        elapsed = time.perf_counter() - start
+        rand_vecs = np.stack([env.unwrapped._last_rand_vec for env in envs])
+        if reference is None:
+            reference = rand_vecs
+        rows.append((workers, '{:.2f}'.format(elapsed),
+                     '{:.1f}'.format(elapsed / args.envs * 1e3),
+                     'yes' if np.array_equal(rand_vecs, reference) else 'NO'))
+        for env in envs:
+            env.close()
+    print_table(('workers', 'total [s]', 'per env [ms]', 'same tasks'), rows)
+
+
+if __name__ == '__main__':
+    main()
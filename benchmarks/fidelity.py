@@ -0,0 +1,68 @@
+"""
+Runs the scripted policy under each simulation profile and reports throughput,
+success rate and divergence of the hand/handle trajectories from the
+reference profile.
+
+    python -m benchmarks.fidelity --episodes 10 --steps 200
+"""
+import argparse
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env, SIM_PROFILES
+
+from .common import rollout, print_table
+
+
+def evaluate_profile(profile, seeds, n_steps):
+    trajectories, successes = [], []
+    total_steps, total_time = 0, 0.
+    for seed in seeds:
+        env = make_dooropen_env(max_episode_length=n_steps, seed=seed,
+                                sim_profile=profile)
+        obs, success, step_time = rollout(env, n_steps)
+        trajectories.append(obs)
+        successes.append(success)
+        total_steps += len(obs) - 1
+        total_time += step_time
+    return trajectories, np.mean(successes), total_steps / total_time
+
+
+def divergence(trajectories, reference):
+    """Mean and max distance of hand (obs[0:3]) and handle (obs[4:7])
+    positions from the reference trajectories, over the common horizon"""
+    errors = []
+    for traj, ref in zip(trajectories, reference):
+        t = min(len(traj), len(ref))
+        diff = traj[:t, np.r_[0:3, 4:7]] - ref[:t, np.r_[0:3, 4:7]]
+        errors.append(np.linalg.norm(diff.reshape(t, 2, 3), axis=-1))
+    errors = np.concatenate(errors)
+    return errors.mean(), errors.max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--episodes', type=int, default=10)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reference', default='default')
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.episodes)
+    results = {name: evaluate_profile(name, seeds, args.steps)
+               for name in SIM_PROFILES}
+    reference = results[args.reference][0]
+
+    rows = []
+    for name, (trajectories, success_rate, steps_per_sec) in results.items():
+        mean_err, max_err = divergence(trajectories, reference)
+        rows.append((name, repr(SIM_PROFILES[name]),
+                     '{:.0f}'.format(steps_per_sec),
+                     '{:.2f}'.format(success_rate),
+                     '{:.2e}'.format(mean_err), '{:.2e}'.format(max_err)))
+    print_table(('profile', 'settings', 'steps/s', 'success',
+                 'mean div [m]', 'max div [m]'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measures, in fresh interpreters, the time to import the package, to reach a
+usable `make_dooropen_env` and to build the first env, and lists which
+optional heavy modules got loaded along the way.
+
+    python -m benchmarks.import_time --repeats 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from .common import print_table
+
+
+# glfw is not listed, `import mujoco_py` always loads it (mujoco_py.mjviewer)
+HEAVY_MODULES = ('scipy', 'imageio', 'OpenGL')
+
+_PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+import metaworld_door_open
+t1 = time.perf_counter()
+from metaworld_door_open import make_dooropen_env
+t2 = time.perf_counter()
+env = make_dooropen_env(max_episode_length=10, seed=0)
+t3 = time.perf_counter()
+print(json.dumps({
+    'import_package': t1 - t0,
+    'import_make_env': t2 - t0,
+    'first_env': t3 - t0,
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def probe():
+    out = subprocess.run([sys.executable, '-c', _PROBE], check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.repeats)]
+    rows = []
+    for key in ('import_package', 'import_make_env', 'first_env'):
+        times = np.array([r[key] for r in results]) * 1e3
+        rows.append((key, '{:.1f}'.format(np.median(times)),
+                     '{:.1f}'.format(times.min())))
+    print_table(('stage', 'median [ms]', 'min [ms]'), rows)
+    print('heavy modules loaded:', ', '.join(results[-1]['loaded']) or 'none')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Resident memory per env with a private model per env and with the shared
+read-only model (`make_dooropen_env(..., share_model=...)`). Each variant runs
+in a fresh process; the first env is built before measuring so that imports
+and caches are not counted.
+
+    python -m benchmarks.model_memory --envs 256
+"""
+import argparse
+import multiprocessing as mp
+
+from .common import print_table, rss_bytes
+
+
+def measure(share_model, n_envs):
+    """Returns (RSS growth per env, MJB size of the model) in bytes"""
+    from metaworld_door_open import make_dooropen_env
+
+    envs = [make_dooropen_env(100, 0, share_model=share_model)]
+    before = rss_bytes()
+    for seed in range(1, n_envs + 1):
+        envs.append(make_dooropen_env(100, seed, share_model=share_model))
+    per_env = (rss_bytes() - before) / n_envs
+    return per_env, len(envs[0].unwrapped.model.get_mjb())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--envs', type=int, default=256)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    rows = []
+    for share_model in (False, True):
+        with ctx.Pool(1) as pool:
+            per_env, mjb_size = pool.apply(measure, (share_model, args.envs))
+        rows.append(('shared' if share_model else 'private',
+                     '{:.0f}'.format(per_env / 2 ** 10),
+                     '{:.0f}'.format(mjb_size / 2 ** 10)))
+    print_table(('model', 'KB/env', 'model MJB [KB]'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Env steps per second of `BatchedDoorEnv` (N copies in one sim) against a
+single `make_dooropen_env` env, driven by the scripted policy. Only the time
+spent in `step()` is counted.
+
+    python -m benchmarks.multi_instance --copies 1 4 16 64 --sim-profile cg
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.batched import BatchedDoorEnv
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+from .common import print_table, rollout
+
+
+def batched_rollout(env, n_steps, policy):
+    """Returns (env steps per second, fraction of copies that succeeded)"""
+    obs = env.reset()
+    succeeded = np.zeros(env.num_envs, dtype=bool)
+    step_time = 0.
+    for _ in range(n_steps):
+        actions = np.stack([policy.get_action(o) for o in obs])
+        start = time.perf_counter()
+        obs, _, _, infos = env.step(actions)
+        step_time += time.perf_counter() - start
+        succeeded |= infos['success'] > 0
+    return env.num_envs * n_steps / step_time, succeeded.mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--sim-profile', default='default')
+    args = parser.parse_args()
+
+    policy = SawyerDoorOpenV2Policy()
+    env = make_dooropen_env(args.steps + 1, 0, sim_profile=args.sim_profile)
+    _, success, step_time = rollout(env, args.steps, policy)
+    single = args.steps / step_time
+    rows = [('single env', '{:.0f}'.format(single), '1.00', '{:.2f}'.format(float(success)))]
+
+    for n_copies in args.copies:
+        env = BatchedDoorEnv(range(n_copies), args.steps + 1,
+                             sim_profile=args.sim_profile)
+        steps_per_s, success_rate = batched_rollout(env, args.steps, policy)
+        rows.append(('{} copies'.format(n_copies), '{:.0f}'.format(steps_per_s),
+                     '{:.2f}'.format(steps_per_s / single),
+                     '{:.2f}'.format(success_rate)))
+    print_table(('', 'env steps/s', 'speedup', 'success'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Offscreen rendering throughput and memory for a growing number of envs in one
+process, with the shared per-process context (`env.render`) and with one
+context per env (the previous `sim.render` path). Every configuration runs in
+a fresh process so that contexts and backends do not leak between them.
+
+    python -m benchmarks.render_throughput --backend osmesa --envs 1 8 32
+"""
+import argparse
+import multiprocessing as mp
+import time
+
+from .common import print_table, rss_bytes
+
+
+def measure(mode, n_envs, n_frames, resolution, backend):
+    """Returns (frames per second, RSS growth per env in bytes)"""
+    if backend is not None:
+        from metaworld_door_open.rendering import select_backend
+        select_backend(backend)
+    from metaworld_door_open import make_dooropen_env
+
+    envs = [make_dooropen_env(100, seed) for seed in range(n_envs)]
+    for env in envs:
+        env.reset()
+
+    if mode == 'shared':
+        def render(env):
+            return env.render(offscreen=True, resolution=resolution)
+    else:
+        def render(env):
+            return env.unwrapped.sim.render(*resolution, mode='offscreen',
+                                            camera_name='corner2')
+
+    before = rss_bytes()
+    for env in envs:
+        render(env)
+    rss_per_env = (rss_bytes() - before) / n_envs
+
+    start = time.perf_counter()
+    for i in range(n_frames):
+        render(envs[i % n_envs])
+    return n_frames / (time.perf_counter() - start), rss_per_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('osmesa', 'egl'), default=None,
+                        help="mujoco_py's own choice by default")
+    parser.add_argument('--envs', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--resolution', type=int, nargs=2, default=[640, 480])
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    rows = []
+    for n_envs in args.envs:
+        for mode in ('shared', 'per-env'):
+            with ctx.Pool(1) as pool:
+                fps, rss = pool.apply(measure, (mode, n_envs, args.frames,
+                                                tuple(args.resolution), args.backend))
+            rows.append((n_envs, mode, '{:.1f}'.format(fps),
+                         '{:.1f}'.format(rss / 2 ** 20)))
+    print_table(('envs', 'contexts', 'frames/s', 'MB/env'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Memory and sampling throughput of `DedupReplayBuffer` (one 18-element block
+per observation) vs `NaiveReplayBuffer` (full observation and next
+observation per transition), filled with random-action rollouts.
+
+    python -m benchmarks.replay_buffer --steps 20000 --batch-size 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.buffers import DedupReplayBuffer, NaiveReplayBuffer
+
+from .common import print_table
+
+
+def fill(buffers, n_steps, max_episode_length, rng):
+    env = make_dooropen_env(max_episode_length, seed=0)
+    naive, dedup = buffers
+    obs = env.reset()
+    dedup.add_reset(obs)
+    for _ in range(n_steps):
+        action = rng.uniform(-1, 1, 4)
+        next_obs, reward, done, _ = env.step(action)
+        naive.add(obs, action, reward, next_obs, done)
+        dedup.add(action, reward, next_obs, done)
+        obs = next_obs
+        if done:
+            obs = env.reset()
+            dedup.add_reset(obs)
+
+
+def samples_per_sec(buffer, batch_size, n_batches, rng):
+    start = time.perf_counter()
+    for _ in range(n_batches):
+        buffer.sample(batch_size, rng)
+    return n_batches * batch_size / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--max-episode-length', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    buffers = (NaiveReplayBuffer(args.steps), DedupReplayBuffer(args.steps))
+    fill(buffers, args.steps, args.max_episode_length, rng)
+
+    rows = []
+    for name, buffer in zip(('naive', 'dedup'), buffers):
+        rows.append((name, '{:.1f}'.format(buffer.nbytes / args.steps),
+                     '{:.1f}'.format(buffer.nbytes / 2 ** 20),
+                     '{:.0f}'.format(samples_per_sec(buffer, args.batch_size,
+                                                     args.batches, rng))))
+    print_table(('buffer', 'bytes/step', 'total [MiB]', 'samples/s'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Latency at episode boundaries (time spent in `reset()`) and overall throughput
+of the scripted policy, for a plain env and for `DoubleBufferedEnv`.
+
+    python -m benchmarks.reset_latency --episodes 50 --steps 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.pipelining import DoubleBufferedEnv
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+from .common import print_table
+
+
+def measure(env, n_episodes, n_steps, think_time):
+    """`think_time` seconds of sleep per step stand in for policy inference"""
+    policy = SawyerDoorOpenV2Policy()
+    resets = []
+    start = time.perf_counter()
+    for _ in range(n_episodes):
+        t = time.perf_counter()
+        obs = env.reset()
+        resets.append(time.perf_counter() - t)
+        done = False
+        while not done:
+            obs, _, done, _ = env.step(policy.get_action(obs))
+            if think_time:
+                time.sleep(think_time)
+    total = time.perf_counter() - start
+    return np.array(resets) * 1e3, n_episodes * n_steps / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--episodes', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--think-time', type=float, default=0.,
+                        help='seconds slept per step to mimic inference')
+    args = parser.parse_args()
+
+    def env_fn():
+        return make_dooropen_env(args.steps, seed=0)
+
+    rows = []
+    for name, env in (('plain', env_fn()),
+                      ('double buffered', DoubleBufferedEnv(env_fn))):
+        # the first reset of the double-buffered env waits for the spare
+        env.reset()
+        resets, steps_per_sec = measure(env, args.episodes, args.steps,
+                                        args.think_time)
+        env.close()
+        rows.append((name, '{:.2f}'.format(np.mean(resets)),
+                     '{:.2f}'.format(np.percentile(resets, 50)),
+                     '{:.2f}'.format(np.percentile(resets, 99)),
+                     '{:.0f}'.format(steps_per_sec)))
+    print_table(('env', 'reset mean [ms]', 'p50 [ms]', 'p99 [ms]', 'steps/s'), rows)
+
+
+if __name__ == '__main__':
+    main()
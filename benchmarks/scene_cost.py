@@ -0,0 +1,91 @@
+"""
+Compares scene variants: physics cost per substep (`sim.step()` only, timed on
+states visited by the scripted policy), mean number of contacts and success
+rate of the scripted policy.
+
+    python -m benchmarks.scene_cost --scenes default lite --episodes 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+from .common import print_table
+
+
+def run_episode(env, n_steps, policy):
+    """Rolls out the policy, recording the sim state before every step"""
+    sim = env.unwrapped.sim
+    obs = env.reset()
+    states, success = [], False
+    for _ in range(n_steps):
+        action = policy.get_action(obs)
+        states.append((sim.get_state(), sim.data.mocap_pos.copy(),
+                       sim.data.mocap_quat.copy(), action))
+        obs, _, done, info = env.step(action)
+        success = success or bool(info['success'])
+        if done:
+            break
+    return states, success
+
+
+def time_substeps(env, states):
+    """Replays recorded states and times the raw substeps from each"""
+    unwrapped = env.unwrapped
+    sim = unwrapped.sim
+    total, n_substeps, n_contacts = 0., 0, 0
+    for state, mocap_pos, mocap_quat, action in states:
+        sim.set_state(state)
+        sim.data.mocap_pos[:] = mocap_pos
+        sim.data.mocap_quat[:] = mocap_quat
+        sim.data.ctrl[:] = [action[-1], -action[-1]]
+        sim.forward()
+        start = time.perf_counter()
+        for _ in range(unwrapped.frame_skip):
+            sim.step()
+        total += time.perf_counter() - start
+        n_substeps += unwrapped.frame_skip
+        n_contacts += sim.data.ncon
+    return total, n_substeps, n_contacts / len(states)
+
+
+def evaluate_scene(scene, seeds, n_steps, **make_kwargs):
+    policy = SawyerDoorOpenV2Policy()
+    successes, contacts = [], []
+    total, n_substeps = 0., 0
+    for seed in seeds:
+        env = make_dooropen_env(n_steps, seed, scene=scene, **make_kwargs)
+        states, success = run_episode(env, n_steps, policy)
+        t, n, ncon = time_substeps(env, states)
+        total += t
+        n_substeps += n
+        successes.append(success)
+        contacts.append(ncon)
+    return total / n_substeps, np.mean(contacts), np.mean(successes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenes', nargs='+', default=['default', 'lite'])
+    parser.add_argument('--episodes', type=int, default=10)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.episodes)
+    rows = []
+    baseline = None
+    for scene in args.scenes:
+        substep, ncon, success_rate = evaluate_scene(scene, seeds, args.steps)
+        baseline = substep if baseline is None else baseline
+        rows.append((scene, '{:.1f}'.format(substep * 1e6),
+                     '{:.2f}x'.format(baseline / substep),
+                     '{:.2f}'.format(ncon), '{:.2f}'.format(success_rate)))
+    print_table(('scene', 'substep [us]', 'speedup', 'contacts', 'success'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Cost of direct start states (`set_start_state`, IK + one `forward()`) vs
+driving the hand there with mocap steps like `_reset_hand`, and the hand
+position error of both.
+
+    python -m benchmarks.start_states --samples 100 --copies 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.batched import BatchedDoorEnv
+from metaworld_door_open.sawyer_xyz.sawyer_door_v2 import SawyerDoorEnvV2
+from metaworld_door_open.start_states import sample_start_states
+
+from .common import print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--copies', type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hand_low = np.array(SawyerDoorEnvV2.HAND_LOW) + [0., 0., 0.1]
+    hand_high = np.array(SawyerDoorEnvV2.HAND_HIGH) - [0.2, 0.1, 0.]
+    hand_pos, door_angle, grip = sample_start_states(rng, args.samples, hand_low, hand_high)
+
+    env = make_dooropen_env(100, seed=0).unwrapped
+    rows = []
+    for name in ('set_start_state', 'mocap steps'):
+        times, errors = [], []
+        for i in range(args.samples):
+            env.reset()
+            start = time.perf_counter()
+            if name == 'set_start_state':
+                env.set_start_state(hand_pos[i], door_angle[i], grip[i])
+            else:
+                env.hand_init_pos = hand_pos[i]
+                env._reset_hand()
+            times.append(time.perf_counter() - start)
+            errors.append(np.linalg.norm(env.get_endeff_pos() - hand_pos[i]))
+        rows.append((name, '{:.2f}'.format(np.mean(times) * 1e3),
+                     '{:.1e}'.format(np.median(errors)), '{:.1e}'.format(np.max(errors))))
+    env.hand_init_pos = np.array(SawyerDoorEnvV2.HAND_INIT_POS)
+
+    batched = BatchedDoorEnv(list(range(args.copies)), 100)
+    start = time.perf_counter()
+    n_batches = max(args.samples // args.copies, 1)
+    for i in range(n_batches):
+        rows_ = slice(i * args.copies, (i + 1) * args.copies)
+        k = len(hand_pos[rows_])
+        batched.set_start_states(hand_pos[rows_], door_angle[rows_], grip[rows_],
+                                 env_ids=np.arange(k))
+    per_state = (time.perf_counter() - start) / (n_batches * args.copies)
+    rows.append(('batched x{}'.format(args.copies), '{:.2f}'.format(per_state * 1e3), '', ''))
+    print_table(('method', 'ms per state', 'median error [m]', 'max error [m]'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Control steps per second of `step_n` (last / summed / all rewards) compared
+to calling `step()` once per action, for action sequences of length k.
+
+    python -m benchmarks.step_n --k 1 5 20 --steps 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+
+from .common import print_table
+
+
+def measure(env, actions, k, returns):
+    """Steps per second over `actions`, resetting whenever an episode ends"""
+    obs_out = np.empty((k,) + env.observation_space.shape, env.observation_space.dtype)
+    reward_out = np.empty(k, env.observation_space.dtype)
+    env.reset()
+    start = time.perf_counter()
+    for i in range(0, len(actions), k):
+        chunk = actions[i:i + k]
+        if returns is None:
+            for action in chunk:
+                done = env.step(action)[2]
+                if done:
+                    env.reset()
+                    break
+        else:
+            done = env.step_n(chunk, returns, obs_out, reward_out)[2]
+            if done:
+                env.reset()
+    return len(actions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--max-episode-length', type=int, default=400)
+    args = parser.parse_args()
+
+    env = make_dooropen_env(args.max_episode_length, seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, (args.steps, 4))
+    rows = []
+    for k in args.k:
+        row = [k]
+        for returns in (None, 'last', 'sum', 'all'):
+            row.append('{:.0f}'.format(measure(env, actions, k, returns)))
+        rows.append(tuple(row))
+    print_table(('k', 'step() loop', "step_n 'last'", "'sum'", "'all'"), rows)
+
+
+if __name__ == '__main__':
+    main()
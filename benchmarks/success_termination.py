@@ -0,0 +1,39 @@
+"""
+Simulated steps saved by ending episodes after success
+(`make_dooropen_env(..., success_grace=...)`) with the scripted policy.
+
+    python -m benchmarks.success_termination --episodes 20 --grace 0 10 25
+"""
+import argparse
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+
+from .common import print_table, rollout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--episodes', type=int, default=20)
+    parser.add_argument('--max-episode-length', type=int, default=300)
+    parser.add_argument('--grace', type=int, nargs='+', default=[0, 10, 25])
+    args = parser.parse_args()
+
+    rows = []
+    for grace in args.grace:
+        lengths, saved = [], []
+        for seed in range(args.episodes):
+            env = make_dooropen_env(args.max_episode_length, seed, success_grace=grace)
+            observations, _, _ = rollout(env, args.max_episode_length)
+            lengths.append(len(observations) - 1)
+            saved.append(env.steps_saved)
+        rows.append((grace, '{:.1f}'.format(np.mean(lengths)),
+                     '{:.1f}'.format(np.mean(saved)),
+                     '{:.0%}'.format(np.sum(saved) / (args.episodes * args.max_episode_length))))
+    print_table(('grace', 'mean length', 'saved/episode', 'saved'), rows)
+
+
+if __name__ == '__main__':
+    main()
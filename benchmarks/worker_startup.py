@@ -0,0 +1,42 @@
+"""
+Spawns vector env workers from `EnvDescriptor`s and reports per-worker startup
+time, next to the payload size of the old pickled-env path.
+
+    python -m benchmarks.worker_startup --workers 16
+"""
+import argparse
+import pickle
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.vector import EnvDescriptor, SubprocVecEnv
+
+from .common import print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--max-episode-length', type=int, default=200)
+    args = parser.parse_args()
+
+    descriptors = [EnvDescriptor(seed, args.max_episode_length)
+                   for seed in range(args.workers)]
+    env = make_dooropen_env(args.max_episode_length, seed=0)
+    print('payload per worker: pickled env {} B, descriptor {} B'.format(
+        len(pickle.dumps(env.unwrapped)), len(pickle.dumps(descriptors[0]))))
+
+    vec_env = SubprocVecEnv(descriptors)
+    vec_env.close()
+    rows = []
+    for name, times in (('startup', vec_env.startup_times),
+                        ('env build', vec_env.build_times)):
+        times = times * 1e3
+        rows.append((name, '{:.1f}'.format(np.median(times)),
+                     '{:.1f}'.format(times.min()), '{:.1f}'.format(times.max())))
+    print_table(('per worker', 'median [ms]', 'min [ms]', 'max [ms]'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,35 @@
-from .factory import make_env as make_dooropen_env, get_sawyer_env_spec
+import importlib
+
+from .rendering import select_backend_from_env
+
+# the render backend has to be chosen before any submodule imports mujoco_py
+select_backend_from_env()
+
+from .profiles import SimProfile, SIM_PROFILES
+
+
+# Attributes below are imported on first access (PEP 562), so importing the
+# package does not load MuJoCo and workers only pay for what they use.
+_LAZY_ATTRS = {
+    'make_dooropen_env': ('.factory', 'make_env'),
+    'make_dooropen_envs': ('.factory', 'make_envs'),
+    'get_sawyer_env_spec': ('.factory', 'get_sawyer_env_spec'),
+    'TaskPool': ('.tasks', 'TaskPool'),
+}
+
+__all__ = ['SimProfile', 'SIM_PROFILES', *_LAZY_ATTRS]
+
+
+def __getattr__(name):
+    try:
+        module_name, attr_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)) from None
+    value = getattr(importlib.import_module(module_name, __name__), attr_name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
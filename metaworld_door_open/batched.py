@@ -0,0 +1,343 @@
+"""
+Several door-opening episodes in one MuJoCo sim.
+
+`scenes.build_multi_scene` tiles N copies of the robot and the door into one
+MJCF. `BatchedDoorEnv` advances all copies with one `sim.step()` per substep
+and maps the combined state to N observations laid out like those of
+`SawyerDoorEnvV2` (39 elements, positions relative to the copy's origin).
+"""
+import re
+import warnings
+
+import gym
+import mujoco_py
+import numpy as np
+
+from .model_cache import shared_model
+from .spec import INFO_DTYPE
+from .profiles import get_sim_profile
+from .scenes import copy_prefix, multi_scene_offsets, multi_scene_path
+from .start_states import (ARM_JOINTS, GRIPPER_JOINTS, check_hand_orientation,
+                           set_gripper, solve_hand_ik)
+from .sawyer_xyz import reward_utils
+from .sawyer_xyz.rotation_utils import mat2quat
+from .sawyer_xyz.sawyer_door_v2 import SawyerDoorEnvV2
+from .tasks import TaskPool
+
+
+# `SawyerXYZEnv` defaults
+ACTION_SCALE = 1. / 100
+HAND_RESET_STEPS = 50
+
+_COPY_NAME = re.compile(r'^c(\d+)_')
+
+
+def _hamacher_product(a, b):
+    """Vectorized `reward_utils.hamacher_product`"""
+    product = a * b
+    denominator = a + b - product
+    return np.where(denominator > 0, product / np.where(denominator > 0, denominator, 1.), 0.)
+
+
+def _long_tail_tolerance(x, upper, margin):
+    """`reward_utils.tolerance(x, bounds=(0, upper), margin, 'long_tail')` for
+    an array of margins"""
+    in_bounds = (0 <= x) & (x <= upper)
+    distance = np.where(x < 0, -x, x - upper) / np.where(margin > 0, margin, 1.)
+    value = reward_utils._sigmoids(distance, reward_utils._DEFAULT_VALUE_AT_MARGIN,
+                                   'long_tail')
+    return np.where(in_bounds, 1., np.where(margin > 0, value, 0.))
+
+
+def door_open_rewards(obs, theta, actions, target_x):
+    """Vectorized `SawyerDoorEnvV2.compute_reward` and success flag.
+
+    Args:
+        obs: (N, 39) observations
+        theta: (N,) door angles
+        actions: (N, 4) actions
+        target_x: (N,) x coordinates of the goals
+
+    Returns:
+        reward, grab reward, ready-to-open reward, opened reward, success,
+        each of shape (N,)
+    """
+    reward_grab = (np.clip(actions[:, 3], -1, 1) + 1.0) / 2.0
+
+    hand = obs[:, :3]
+    door = obs[:, 4:7] + np.array([-0.05, 0, 0])
+    threshold = 0.12
+    radius = np.linalg.norm(hand[:, :2] - door[:, :2], axis=1)
+    floor = np.where(radius <= threshold, 0.0,
+                     0.04 * np.log(np.maximum(radius - threshold, 1e-300)) + 0.4)
+    above_floor = np.where(hand[:, 2] >= floor, 1.0,
+                           _long_tail_tolerance(floor - hand[:, 2], 0.01, floor / 2.0))
+    in_place = reward_utils.tolerance(
+        np.linalg.norm(hand - door - np.array([0.05, 0.03, -0.01]), axis=1),
+        bounds=(0, threshold / 2.0),
+        margin=0.5,
+        sigmoid='long_tail',
+    )
+    ready_to_open = _hamacher_product(above_floor, in_place)
+
+    door_angle = -theta
+    opened = 0.2 * (theta < -np.pi / 90.) + 0.8 * reward_utils.tolerance(
+        np.pi / 2. + np.pi / 6 - door_angle,
+        bounds=(0, 0.5),
+        margin=np.pi / 3.,
+        sigmoid='long_tail',
+    )
+
+    reward = 2.0 * _hamacher_product(ready_to_open, reward_grab) + 8.0 * opened
+    success = np.abs(obs[:, 4] - target_x) <= 0.08
+    reward[success] = 10.0
+    return reward, reward_grab, ready_to_open, opened, success
+
+
+class BatchedDoorEnv:
+    """
+    Vector env facade over a multi-instance scene, one copy per seed.
+
+    The door position of copy k is drawn from `seeds[k]` like in
+    `make_dooropen_env` (or taken from `rand_vecs`) and kept across episodes.
+    `step()` takes (N, 4) actions and returns (N, 39) observations, (N,)
+    rewards and dones and the infos as a structured array of `INFO_DTYPE`.
+    The returned arrays are reused by the next call. Copies are reset
+    automatically after `max_episode_length` steps, their last observation is
+    in `terminal_observations`. With `success_grace`, episodes end that many
+    steps after their first success, like with `EpisodeLengthWrapper`, and the
+    steps cut off are counted in `steps_saved` (last episode per copy) and
+    `total_steps_saved`.
+
+    The hand settles to the same joint state on every reset, so it is settled
+    once on construction and resets only restore that state (with the solver
+    warm start) per copy. A sim exception ends the episodes of all copies.
+    """
+    def __init__(self, seeds, max_episode_length, sim_profile='default',
+                 scene='default', rand_vecs=None, success_grace=None):
+        self.num_envs = n = len(seeds)
+        self.max_episode_length = max_episode_length
+        self.success_grace = success_grace
+        profile = get_sim_profile(sim_profile)
+        self.frame_skip = profile.frame_skip
+        self.model = shared_model(multi_scene_path(n, base=scene), profile)
+        self.sim = mujoco_py.MjSim(self.model)
+        self.data = self.sim.data
+        self.offsets = np.array(multi_scene_offsets(n))
+
+        if rand_vecs is None:
+            rand_vecs = TaskPool.from_seeds(seeds).rand_vecs
+        self.rand_vecs = np.asarray(rand_vecs, dtype=np.float64)
+        assert self.rand_vecs.shape == (n, 3)
+        self._target_pos = self.rand_vecs + np.array(SawyerDoorEnvV2.GOAL_OFFSET)
+        self._mocap_low = np.array(SawyerDoorEnvV2.HAND_LOW) + self.offsets
+        self._mocap_high = np.array(SawyerDoorEnvV2.HAND_HIGH) + self.offsets
+
+        self.observation_space = gym.spaces.Box(-np.inf, np.inf, (39,), np.float64)
+        self.action_space = gym.spaces.Box(-1., 1., (4,), np.float64)
+
+        self._find_ids()
+        self._obs = np.zeros((n, 39))
+        self._curr_obs = np.zeros((n, 18))
+        self._prev_obs = np.zeros((n, 18))
+        self.terminal_observations = np.zeros((n, 39))
+        self.infos = np.zeros(n, dtype=INFO_DTYPE)
+        self.path_lengths = np.zeros(n, dtype=np.int64)
+        self._first_success = np.full(n, -1, dtype=np.int64)
+        self.steps_saved = np.zeros(n, dtype=np.int64)
+        self.total_steps_saved = 0
+        self._all = np.arange(n)
+        self._settle_hands()
+
+    def _find_ids(self):
+        m, n = self.model, self.num_envs
+
+        def ids(name2id, name):
+            return np.array([name2id(copy_prefix(k) + name) for k in range(n)])
+
+        self._hand_body = ids(m.body_name2id, 'hand')
+        self._hand_mocap = m.body_mocapid[ids(m.body_name2id, 'mocap')]
+        self._door_mocap = m.body_mocapid[ids(m.body_name2id, 'door')]
+        self._goal_mocap = m.body_mocapid[ids(m.body_name2id, 'goal')]
+        self._right_site = ids(m.site_name2id, 'rightEndEffector')
+        self._left_site = ids(m.site_name2id, 'leftEndEffector')
+        self._handle_geom = ids(m.geom_name2id, 'handle')
+        door_joint = ids(m.joint_name2id, 'doorjoint')
+        self._door_qpos = m.jnt_qposadr[door_joint]
+        self._door_dof = m.jnt_dofadr[door_joint]
+        self._door_angle_range = m.jnt_range[door_joint[0]]
+        self._arm_joints = np.stack([ids(m.joint_name2id, name) for name in ARM_JOINTS], axis=1)
+        self._gripper_joints = np.stack([ids(m.joint_name2id, name) for name in GRIPPER_JOINTS],
+                                        axis=1)
+
+        # gripper actuators, found through the joint they drive
+        actuator_joint = m.actuator_trnid[:, 0]
+        self._grip_ctrl = np.array([
+            [np.flatnonzero(actuator_joint == m.joint_name2id(copy_prefix(k) + joint))[0]
+             for joint in ('r_close', 'l_close')]
+            for k in range(n)])
+
+        # (N, joints per copy) addresses, all joints are hinges or slides.
+        # Joints outside the copies (unprefixed root body) belong to none.
+        assert np.all(m.jnt_type >= mujoco_py.const.JNT_SLIDE)
+        joint_copy = np.full(m.njnt, -1)
+        for j, root in enumerate(m.body_rootid[m.jnt_bodyid]):
+            match = _COPY_NAME.match(m.body_id2name(root) or '')
+            if match is not None:
+                joint_copy[j] = int(match.group(1))
+        self._qpos_idx = np.stack([m.jnt_qposadr[joint_copy == k] for k in range(n)])
+        self._dof_idx = np.stack([m.jnt_dofadr[joint_copy == k] for k in range(n)])
+
+    def _settle_hands(self):
+        """`SawyerXYZEnv._reset_hand` for all copies, caches the result"""
+        d = self.data
+        self.sim.reset()
+        self._place_doors(self._all)
+        hand_pos = np.array(SawyerDoorEnvV2.HAND_INIT_POS) + self.offsets
+        for _ in range(HAND_RESET_STEPS):
+            d.mocap_pos[self._hand_mocap] = hand_pos
+            d.mocap_quat[self._hand_mocap] = np.array([1, 0, 1, 0])
+            d.ctrl[self._grip_ctrl] = np.array([-1., 1.])
+            for _ in range(self.frame_skip):
+                self.sim.step()
+        self._reset_qpos = d.qpos[self._qpos_idx]
+        self._reset_qvel = d.qvel[self._dof_idx]
+        self._reset_warmstart = d.qacc_warmstart[self._dof_idx]
+        self._reset_hand_pos = d.mocap_pos[self._hand_mocap]
+        self.reset()
+
+    def _place_doors(self, ids):
+        self.data.mocap_pos[self._door_mocap[ids]] = self.rand_vecs[ids] + self.offsets[ids]
+        self.data.mocap_pos[self._goal_mocap[ids]] = self._target_pos[ids] + self.offsets[ids]
+
+    def reset(self, env_ids=None):
+        """Resets the copies `env_ids` (all by default) and returns the
+        observations of all copies"""
+        ids = self._all if env_ids is None else np.asarray(env_ids)
+        self._restore_reset_state(ids)
+        self.sim.forward()
+        self._start_episodes(ids)
+        return self._obs
+
+    def set_start_states(self, hand_pos, door_angles, grips, env_ids=None):
+        """Resets the copies `env_ids` (all by default) to the given start
+        states without simulating, see `SawyerDoorEnvV2.set_start_state`.
+
+        Args:
+            hand_pos: (M, 3) hand positions relative to the copy origins
+            door_angles: (M,) door angles (negative is open)
+            grips: (M,) gripper actions
+
+        Returns:
+            observations of all copies
+        """
+        ids = self._all if env_ids is None else np.asarray(env_ids)
+        d = self.data
+        self._restore_reset_state(ids)
+        hand_pos = np.clip(np.asarray(hand_pos) + self.offsets[ids],
+                           self._mocap_low[ids], self._mocap_high[ids])
+        d.qvel[self._dof_idx[ids]] = 0.
+        d.qacc_warmstart[self._dof_idx[ids]] = 0.
+        d.qpos[self._door_qpos[ids]] = np.clip(door_angles, *self._door_angle_range)
+        d.mocap_pos[self._hand_mocap[ids]] = hand_pos
+        set_gripper(self.sim, self._gripper_joints[ids], self._grip_ctrl[ids], grips)
+        solve_hand_ik(self.sim, self._hand_body[ids], self._arm_joints[ids], hand_pos)
+        self.sim.forward()
+        check_hand_orientation(self.sim, self._hand_body[ids], self._hand_mocap[ids])
+        self._start_episodes(ids, restart_frames=True)
+        return self._obs
+
+    def _restore_reset_state(self, ids):
+        d = self.data
+        d.qpos[self._qpos_idx[ids]] = self._reset_qpos[ids]
+        d.qvel[self._dof_idx[ids]] = self._reset_qvel[ids]
+        d.qacc_warmstart[self._dof_idx[ids]] = self._reset_warmstart[ids]
+        d.qpos[self._door_qpos[ids]] = 0.
+        d.qvel[self._door_dof[ids]] = 0.
+        d.mocap_pos[self._hand_mocap[ids]] = self._reset_hand_pos[ids]
+        d.mocap_quat[self._hand_mocap[ids]] = np.array([1, 0, 1, 0])
+        d.ctrl[self._grip_ctrl[ids]] = np.array([-1., 1.])
+        self._place_doors(ids)
+
+    def _start_episodes(self, ids, restart_frames=False):
+        self.path_lengths[ids] = 0
+        self._first_success[ids] = -1
+        self._write_obs(ids, restart_frames)
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        d = self.data
+        hand = self._hand_mocap
+        d.mocap_pos[hand] = np.clip(
+            d.mocap_pos[hand] + np.clip(actions[:, :3], -1, 1) * ACTION_SCALE,
+            self._mocap_low, self._mocap_high)
+        d.mocap_quat[hand] = np.array([1, 0, 1, 0])
+        d.ctrl[self._grip_ctrl[:, 0]] = actions[:, 3]
+        d.ctrl[self._grip_ctrl[:, 1]] = -actions[:, 3]
+        try:
+            for _ in range(self.frame_skip):
+                self.sim.step()
+        except mujoco_py.MujocoException as err:
+            warnings.warn(str(err), category=RuntimeWarning)
+            return self._end_all_episodes()
+
+        self.path_lengths += 1
+        self._write_obs(self._all)
+        rewards = self._evaluate(actions)
+        dones = self.path_lengths >= self.max_episode_length
+        if self.success_grace is not None:
+            first = (self._first_success < 0) & (self.infos['success'] > 0)
+            self._first_success[first] = self.path_lengths[first]
+            dones |= (self._first_success >= 0) & \
+                (self.path_lengths >= self._first_success + self.success_grace)
+        if dones.any():
+            done_ids = np.flatnonzero(dones)
+            saved = self.max_episode_length - self.path_lengths[done_ids]
+            self.steps_saved[done_ids] = saved
+            self.total_steps_saved += int(saved.sum())
+            self.terminal_observations[done_ids] = self._obs[done_ids]
+            self.reset(done_ids)
+        return self._obs, rewards, dones, self.infos
+
+    def _end_all_episodes(self):
+        """Like the single env, an unstable step is reported with the last
+        stable observation and zero reward, here for every copy"""
+        self.terminal_observations[:] = self._obs
+        self.infos[:] = 0
+        self.reset()
+        return (self._obs, np.zeros(self.num_envs),
+                np.ones(self.num_envs, dtype=bool), self.infos)
+
+    def _write_obs(self, ids, restart_frames=False):
+        d, curr = self.data, self._curr_obs
+        curr[:, 0:3] = d.body_xpos[self._hand_body] - self.offsets
+        finger_distance = np.linalg.norm(
+            d.site_xpos[self._right_site] - d.site_xpos[self._left_site], axis=1)
+        curr[:, 3] = np.clip(finger_distance / 0.1, 0., 1.)
+        curr[:, 4:7] = d.geom_xpos[self._handle_geom] - self.offsets
+        curr[:, 7:11] = mat2quat(d.geom_xmat[self._handle_geom].reshape(-1, 3, 3))
+        if restart_frames:
+            self._prev_obs[ids] = curr[ids]
+
+        obs = self._obs
+        obs[ids, :18] = curr[ids]
+        obs[ids, 18:36] = self._prev_obs[ids]
+        obs[ids, 36:] = self._target_pos[ids]
+        self._prev_obs[ids] = curr[ids]
+
+    def _evaluate(self, actions):
+        reward, grab, ready, opened, success = door_open_rewards(
+            self._obs, self.data.qpos[self._door_qpos], actions,
+            self._target_pos[:, 0])
+        infos = self.infos
+        infos['success'] = success
+        infos['near_object'] = ready
+        infos['grasp_success'] = grab >= 0.5
+        infos['grasp_reward'] = grab
+        infos['in_place_reward'] = opened
+        infos['obj_to_target'] = 0.
+        infos['unscaled_reward'] = reward
+        return reward
+
+    def close(self):
+        pass
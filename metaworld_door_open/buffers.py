@@ -0,0 +1,177 @@
+"""
+Replay buffers for the 39-element observations of `SawyerXYZEnv._get_obs`.
+
+An observation is `[curr(18), prev(18), goal(3)]`: `prev` is the `curr` block
+of the previous observation and `goal` is constant within an episode.
+`DedupReplayBuffer` therefore stores one 18-element block per observation plus
+the goal and the first `prev` block per episode, and rebuilds full
+observations with gathers when sampling. `NaiveReplayBuffer` stores full
+observations and is the reference it is measured against.
+"""
+import numpy as np
+
+
+CURR = np.s_[0:18]
+PREV = np.s_[18:36]
+GOAL = np.s_[36:39]
+OBS_DIM = 39
+
+
+class NaiveReplayBuffer:
+    """Ring buffer of (obs, action, reward, next_obs, done) transitions"""
+    def __init__(self, capacity, action_dim=4, dtype=np.float32):
+        self.capacity = capacity
+        self.obs = np.zeros((capacity, OBS_DIM), dtype=dtype)
+        self.next_obs = np.zeros((capacity, OBS_DIM), dtype=dtype)
+        self.actions = np.zeros((capacity, action_dim), dtype=dtype)
+        self.rewards = np.zeros(capacity, dtype=dtype)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self._pos = 0
+        self.size = 0
+
+    def add(self, obs, action, reward, next_obs, done):
+        i = self._pos
+        self.obs[i] = obs
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_obs[i] = next_obs
+        self.dones[i] = done
+        self._pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size, rng):
+        idx = rng.integers(0, self.size, batch_size)
+        return (self.obs[idx], self.actions[idx], self.rewards[idx],
+                self.next_obs[idx], self.dones[idx])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.obs, self.next_obs, self.actions,
+                                      self.rewards, self.dones))
+
+
+class DedupReplayBuffer:
+    """
+    Replay buffer that stores the `curr` block of every observation once.
+
+    Episodes are written with `add_reset(obs)` followed by one `add(...)` per
+    step. Several envs can write to the same buffer, `env_id` keeps their
+    episodes apart. Each frame (observation) records the serial number of the
+    previous frame of its episode, so `prev` blocks are found even when the
+    episodes of several envs are interleaved. Transitions whose frames have
+    been overwritten are not sampled.
+
+    Args:
+        capacity: number of frames (about one per transition)
+        max_episodes: number of episodes whose goals are kept, episodes older
+            than that are not sampled (default `capacity // 8`)
+    """
+    def __init__(self, capacity, action_dim=4, dtype=np.float32, max_episodes=None):
+        self.capacity = capacity
+        self.max_episodes = max(capacity // 8, 1) if max_episodes is None else max_episodes
+        self.curr = np.zeros((capacity, 18), dtype=dtype)
+        # serial number of the previous frame of the episode, -1 for the first
+        self.prev_frame = np.full(capacity, -1, dtype=np.int64)
+        self.episode = np.full(capacity, -1, dtype=np.int64)
+        # transition ending at the frame, unused for first frames
+        self.actions = np.zeros((capacity, action_dim), dtype=dtype)
+        self.rewards = np.zeros(capacity, dtype=dtype)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.goals = np.zeros((self.max_episodes, 3), dtype=dtype)
+        self.first_prev = np.zeros((self.max_episodes, 18), dtype=dtype)
+
+        self._n_frames = 0
+        self._n_episodes = 0
+        # env_id -> (episode, serial of the last frame)
+        self._open = {}
+
+    @property
+    def size(self):
+        return min(self._n_frames, self.capacity)
+
+    def add_reset(self, obs, env_id=0):
+        """Starts an episode of `env_id` with its first observation"""
+        episode = self._n_episodes
+        self._n_episodes += 1
+        self.goals[episode % self.max_episodes] = obs[GOAL]
+        self.first_prev[episode % self.max_episodes] = obs[PREV]
+        self._open[env_id] = episode, self._write_frame(obs, episode, -1)
+
+    def add(self, action, reward, next_obs, done, env_id=0):
+        """Adds the step of `env_id` that led to `next_obs`"""
+        episode, last = self._open[env_id]
+        serial = self._write_frame(next_obs, episode, last)
+        i = serial % self.capacity
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        if done:
+            del self._open[env_id]
+        else:
+            self._open[env_id] = episode, serial
+
+    def _write_frame(self, obs, episode, prev_frame):
+        serial = self._n_frames
+        i = serial % self.capacity
+        self.curr[i] = obs[CURR]
+        self.prev_frame[i] = prev_frame
+        self.episode[i] = episode
+        self._n_frames += 1
+        return serial
+
+    def _alive(self, serials):
+        return serials >= self._n_frames - self.capacity
+
+    def _valid(self, idx):
+        """Whether the transitions ending at the slots `idx` can be rebuilt"""
+        prev = self.prev_frame[idx]
+        prev_prev = self.prev_frame[prev % self.capacity]
+        return ((prev >= 0) & self._alive(prev)
+                & ((prev_prev < 0) | self._alive(prev_prev))
+                & (self.episode[idx] >= self._n_episodes - self.max_episodes))
+
+    def sample(self, batch_size, rng, max_rounds=16):
+        """Returns obs (B, 39), actions, rewards, next_obs (B, 39), dones
+
+        Invalid slots are redrawn for up to `max_rounds` rounds, after that
+        the batch is drawn from the valid slots directly.
+
+        Raises:
+            ValueError: if the buffer holds no transition that can be rebuilt
+        """
+        idx = np.empty(batch_size, dtype=np.int64)
+        filled = 0
+        for _ in range(max_rounds):
+            if filled == batch_size:
+                break
+            candidates = rng.integers(0, max(self.size, 1), batch_size - filled)
+            candidates = candidates[self._valid(candidates)]
+            idx[filled:filled + len(candidates)] = candidates
+            filled += len(candidates)
+        if filled < batch_size:
+            valid = np.flatnonzero(self._valid(np.arange(self.size)))
+            if len(valid) == 0:
+                raise ValueError('The buffer holds no complete transition')
+            idx[filled:] = rng.choice(valid, batch_size - filled)
+
+        prev = self.prev_frame[idx] % self.capacity
+        prev_prev = self.prev_frame[prev]
+        episode = self.episode[idx] % self.max_episodes
+        goals = self.goals[episode]
+
+        obs = np.empty((batch_size, OBS_DIM), dtype=self.curr.dtype)
+        obs[:, CURR] = self.curr[prev]
+        obs[:, PREV] = np.where((prev_prev < 0)[:, None], self.first_prev[episode],
+                                self.curr[prev_prev % self.capacity])
+        obs[:, GOAL] = goals
+        next_obs = np.empty_like(obs)
+        next_obs[:, CURR] = self.curr[idx]
+        next_obs[:, PREV] = obs[:, CURR]
+        next_obs[:, GOAL] = goals
+        return obs, self.actions[idx], self.rewards[idx], next_obs, self.dones[idx]
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.curr, self.prev_frame, self.episode,
+                                      self.actions, self.rewards, self.dones,
+                                      self.goals, self.first_prev))
@@ -1,28 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
 from .sawyer_xyz.env_dict import ALL_V2_ENVIRONMENTS_GOAL_OBSERVABLE
-from .wrappers import DoorOpenNoGripperObs, DoorOpenNoGripperControl, \
-    EpisodeLengthWrapper
+from .wrappers import EpisodeLengthWrapper, TaskPoolWrapper
 from .spec import EnvSpec, VecQuantSpec, OBS_SPECS, quants_to_sizes
 from .utils import DoorOpenRewardFunctor
 
 
-def make_env(max_episode_length, seed, use_gripper=True):
+def make_env(max_episode_length, seed, use_gripper=True, sim_profile='default',
+             task_pool=None, rand_vec=None, scene='default', dtype=np.float64,
+             info_mode='dict', action_log=None, share_model=True,
+             success_grace=None, reward_mode='eager', overwrite_action_log=False,
+             task_seed=None):
     """
     seed: necessarily required bc __init__ is set manually and initializes random_vec
+    sim_profile: name from `profiles.SIM_PROFILES` or a `SimProfile`
+    task_pool: optional `TaskPool`, a task is drawn from it on every reset
+    rand_vec: optional door position, skips sampling it from `seed`
+    scene: scene variant, name from `scenes.SCENES`
+    dtype: dtype of observations, rewards and spaces (e.g. np.float32)
+    info_mode: 'dict' or 'record' (reused structured array), see `set_info_mode`
+    action_log: optional path, episodes are logged there for `replay`
+    share_model: back the sim with the process-wide read-only model
+        (`model_cache.shared_model`) instead of a private copy
+    success_grace: end episodes this many steps after the first success
+        instead of running them to `max_episode_length`
+    reward_mode: 'eager' or 'lazy' (rewards and infos computed on demand
+        through `last_reward` / `last_info`), see `set_reward_mode`
+    overwrite_action_log: replace an existing file at `action_log` instead
+        of raising FileExistsError
+    task_seed: seed of the task draws from `task_pool`, defaults to `seed`
     """
-    env = ALL_V2_ENVIRONMENTS_GOAL_OBSERVABLE['door-open-v2-goal-observable'](seed)
+    env = ALL_V2_ENVIRONMENTS_GOAL_OBSERVABLE['door-open-v2-goal-observable'](
+        seed, rand_vec=rand_vec, sim_profile=sim_profile, scene=scene,
+        share_model=share_model)
 
     if not use_gripper:
-        env = DoorOpenNoGripperObs(env)
-        env = DoorOpenNoGripperControl(env)
+        env.configure_gripper(observe=False, control=False)
+    env.set_dtype(dtype)
+    env.set_info_mode(info_mode)
+    env.set_reward_mode(reward_mode)
+    assert reward_mode == 'eager' or success_grace is None, \
+        "Ending episodes on success needs the success flag of every step."
 
     assert isinstance(max_episode_length, int) and max_episode_length < 500, \
         "Implementation of MujocoEnv does not allow rollouts with more than 500 steps."
     
-    env = EpisodeLengthWrapper(env, max_length=max_episode_length)
+    if action_log is not None:
+        from .replay import ActionLogWriter, ActionRecorder, log_config
+        writer = ActionLogWriter(action_log, log_config(
+            max_episode_length, seed, use_gripper, sim_profile, scene, dtype),
+            overwrite=overwrite_action_log)
+        env = ActionRecorder(env, writer)
+
+    if task_pool is not None:
+        env = TaskPoolWrapper(env, task_pool,
+                              seed=seed if task_seed is None else task_seed)
+
+    env = EpisodeLengthWrapper(env, max_length=max_episode_length,
+                               success_grace=success_grace)
 
     return env
 
 
+def make_envs(seeds, max_workers=None, *, max_episode_length, **kwargs):
+    """
+    Builds one env per seed with `make_env` from a pool of `max_workers`
+    threads, in the order of `seeds`. Every env draws its door position from
+    its own generator, so the result does not depend on the scheduling.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda seed: make_env(max_episode_length, seed, **kwargs), seeds))
+
+
 def get_sawyer_env_spec():
     obs_spec = VecQuantSpec.from_desc(OBS_SPECS['default'], quants_to_sizes)
     return EnvSpec(env_name='dooropen',
@@ -0,0 +1,32 @@
+"""Filesystem helpers shared by the model cache, the scene generator and
+the monitoring export"""
+import hashlib
+import os
+
+
+# compiled models and generated scenes
+CACHE_DIR = os.environ.get(
+    'DOOROPEN_MODEL_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'metaworld_door_open'))
+
+
+def stat_digest(paths, *extra):
+    """SHA-1 hex digest of `extra` and of path, size and mtime of every file
+    in `paths`"""
+    digest = hashlib.sha1()
+    for value in extra:
+        digest.update('{}\n'.format(value).encode())
+    for path in paths:
+        st = os.stat(path)
+        digest.update('{}:{}:{}\n'.format(
+            os.path.abspath(path), st.st_size, st.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def atomic_write(path, data):
+    """Writes `data` (bytes or str) to `path` through a temporary file and a
+    rename, so concurrent readers see either the old or the new file"""
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,84 @@
+"""
+Compiled model cache.
+
+Compiling the scene XML (parsing, mesh loading, convex hulls) dominates env
+construction. The compiled model is kept as MJB bytes in memory and on disk, so
+each process compiles at most once and workers on the same machine usually
+never do.
+"""
+import os
+import threading
+import warnings
+
+import mujoco_py
+
+from .fileutils import CACHE_DIR, atomic_write, stat_digest
+from .scenes import scene_files
+
+
+_mjb_cache = {}
+_shared_models = {}
+_cache_keys = {}
+# envs may be built from several threads (e.g. `DoubleBufferedEnv`)
+_lock = threading.RLock()
+
+
+def _cache_key(model_path):
+    """Digest of the MuJoCo version and of path, size and mtime of the model
+    and the files it references (`scenes.scene_files`). Computed once per
+    process and model path."""
+    model_path = os.path.abspath(model_path)
+    key = _cache_keys.get(model_path)
+    if key is None:
+        key = _cache_keys[model_path] = stat_digest(
+            scene_files(model_path), mujoco_py.__version__)
+    return key
+
+
+def _read_disk_cache(key):
+    try:
+        with open(os.path.join(CACHE_DIR, key + '.mjb'), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_disk_cache(key, mjb):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(os.path.join(CACHE_DIR, key + '.mjb'), mjb)
+    except OSError as err:
+        warnings.warn('Could not write model cache: {}'.format(err),
+                      category=RuntimeWarning)
+
+
+def load_model(model_path):
+    """Returns a fresh `PyMjModel` for the XML at `model_path`"""
+    key = _cache_key(model_path)
+    with _lock:
+        mjb = _mjb_cache.get(key)
+        if mjb is None:
+            mjb = _read_disk_cache(key)
+            if mjb is None:
+                model = mujoco_py.load_model_from_path(model_path)
+                mjb = model.get_mjb()
+                _write_disk_cache(key, mjb)
+                _mjb_cache[key] = mjb
+                return model
+            _mjb_cache[key] = mjb
+    return mujoco_py.load_model_from_mjb(mjb)
+
+
+def shared_model(model_path, sim_profile=None):
+    """Returns the process-wide `PyMjModel` for `model_path` with `sim_profile`
+    applied. It backs every sim built from the same arguments, so it must be
+    treated as read-only: per-episode changes go to the sim data."""
+    key = (_cache_key(model_path), repr(sim_profile))
+    with _lock:
+        model = _shared_models.get(key)
+        if model is None:
+            model = load_model(model_path)
+            if sim_profile is not None:
+                sim_profile.apply(model)
+            _shared_models[key] = model
+    return model
@@ -0,0 +1,193 @@
+"""
+Episode statistics aggregated from the `info` dicts without keeping per-step
+data: everything lives in fixed-size arrays indexed by env.
+"""
+
+import numpy as np
+import gym
+
+from .fileutils import atomic_write
+from .spec import INFO_DTYPE
+
+
+INFO_KEYS = INFO_DTYPE.names
+
+
+class EpisodeStats:
+    """
+    Running aggregates for `num_envs` envs.
+
+    Current episode: `sum`, `max` (per env and info key), `length`,
+    `first_success` (step index, -1 if none yet), `streak` (current run of
+    successful steps) and `best_streak`. The same fields prefixed with `last_`
+    hold the most recently finished episode. Across episodes: `episodes`,
+    `success_episodes` and `total_sum`.
+    """
+    def __init__(self, num_envs=1, keys=INFO_KEYS):
+        self.keys = tuple(keys)
+        self._success_idx = self.keys.index('success')
+        n_keys = len(self.keys)
+        self._row = np.zeros(n_keys)
+
+        self.sum = np.zeros((num_envs, n_keys))
+        self.max = np.full((num_envs, n_keys), -np.inf)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.first_success = np.full(num_envs, -1, dtype=np.int64)
+        self.streak = np.zeros(num_envs, dtype=np.int64)
+        self.best_streak = np.zeros(num_envs, dtype=np.int64)
+
+        self.last_sum = np.zeros((num_envs, n_keys))
+        self.last_max = np.zeros((num_envs, n_keys))
+        self.last_length = np.zeros(num_envs, dtype=np.int64)
+        self.last_first_success = np.full(num_envs, -1, dtype=np.int64)
+        self.last_best_streak = np.zeros(num_envs, dtype=np.int64)
+
+        self.episodes = np.zeros(num_envs, dtype=np.int64)
+        self.success_episodes = np.zeros(num_envs, dtype=np.int64)
+        self.total_sum = np.zeros((num_envs, n_keys))
+
+    @property
+    def num_envs(self):
+        return len(self.length)
+
+    def update(self, env_id, info, done=False):
+        row = self._row
+        for i, key in enumerate(self.keys):
+            row[i] = info[key]
+        np.add(self.sum[env_id], row, out=self.sum[env_id])
+        np.maximum(self.max[env_id], row, out=self.max[env_id])
+
+        if row[self._success_idx]:
+            if self.first_success[env_id] < 0:
+                self.first_success[env_id] = self.length[env_id]
+            self.streak[env_id] += 1
+            if self.streak[env_id] > self.best_streak[env_id]:
+                self.best_streak[env_id] = self.streak[env_id]
+        else:
+            self.streak[env_id] = 0
+        self.length[env_id] += 1
+
+        if done:
+            self.end_episode(env_id)
+
+    def update_batch(self, infos, dones, env_ids=None):
+        """Vector env form of `update`, one info per env. Infos given as a
+        structured array (the 'record' info mode) are aggregated vectorized.
+
+        env_ids: envs the rows of `infos` and `dones` belong to, e.g. the
+            subset returned by an async vector env's `recv`; all envs in
+            order if None. Other envs are left untouched.
+        """
+        if env_ids is None:
+            env_ids = np.arange(self.num_envs)
+        env_ids = np.asarray(env_ids, dtype=np.int64)
+        if not isinstance(infos, np.ndarray):
+            for env_id, info, done in zip(env_ids, infos, dones):
+                self.update(env_id, info, done)
+            return
+
+        values = np.stack([infos[key] for key in self.keys], axis=1)
+        self.sum[env_ids] += values
+        self.max[env_ids] = np.maximum(self.max[env_ids], values)
+
+        success = values[:, self._success_idx] != 0
+        first = env_ids[success & (self.first_success[env_ids] < 0)]
+        self.first_success[first] = self.length[first]
+        streak = np.where(success, self.streak[env_ids] + 1, 0)
+        self.streak[env_ids] = streak
+        self.best_streak[env_ids] = np.maximum(self.best_streak[env_ids], streak)
+        self.length[env_ids] += 1
+
+        for env_id in env_ids[np.flatnonzero(dones)]:
+            self.end_episode(env_id)
+
+    def end_episode(self, env_id):
+        self.last_sum[env_id] = self.sum[env_id]
+        self.last_max[env_id] = self.max[env_id]
+        self.last_length[env_id] = self.length[env_id]
+        self.last_first_success[env_id] = self.first_success[env_id]
+        self.last_best_streak[env_id] = self.best_streak[env_id]
+
+        self.episodes[env_id] += 1
+        self.success_episodes[env_id] += self.first_success[env_id] >= 0
+        self.total_sum[env_id] += self.sum[env_id]
+
+        self.sum[env_id] = 0.
+        self.max[env_id] = -np.inf
+        self.length[env_id] = 0
+        self.first_success[env_id] = -1
+        self.streak[env_id] = 0
+        self.best_streak[env_id] = 0
+
+    def snapshot(self):
+        """Copies of all aggregates, keyed by attribute name"""
+        names = ('sum', 'max', 'length', 'first_success', 'streak',
+                 'best_streak', 'last_sum', 'last_max', 'last_length',
+                 'last_first_success', 'last_best_streak', 'episodes',
+                 'success_episodes', 'total_sum')
+        snapshot = {name: getattr(self, name).copy() for name in names}
+        snapshot['keys'] = self.keys
+        return snapshot
+
+    def write_prometheus(self, path, prefix='dooropen'):
+        """Writes the aggregates in the Prometheus text format, atomically so
+        that e.g. the node_exporter textfile collector never sees partial files"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+            for labels, value in samples:
+                label_text = ','.join('{}="{}"'.format(k, v) for k, v in labels)
+                lines.append('{}_{}{{{}}} {}'.format(prefix, name, label_text, value))
+
+        envs = range(self.num_envs)
+        metric('episodes_total', 'counter', 'Finished episodes',
+               [((('env', e),), self.episodes[e]) for e in envs])
+        metric('success_episodes_total', 'counter', 'Finished episodes with success',
+               [((('env', e),), self.success_episodes[e]) for e in envs])
+        metric('last_episode_length', 'gauge', 'Length of the last finished episode',
+               [((('env', e),), self.last_length[e]) for e in envs])
+        metric('last_episode_first_success_step', 'gauge',
+               'First successful step of the last finished episode, -1 if none',
+               [((('env', e),), self.last_first_success[e]) for e in envs])
+        metric('last_episode_success_streak', 'gauge',
+               'Longest run of successful steps in the last finished episode',
+               [((('env', e),), self.last_best_streak[e]) for e in envs])
+        for name, values, help_text in (
+                ('last_episode_sum', self.last_sum, 'Per-key sum over the last finished episode'),
+                ('last_episode_max', self.last_max, 'Per-key max over the last finished episode'),
+                ('info_sum_total', self.total_sum, 'Per-key sum over all finished episodes')):
+            metric(name, 'gauge' if name.startswith('last') else 'counter', help_text,
+                   [((('env', e), ('key', k)), values[e, i])
+                    for e in envs for i, k in enumerate(self.keys)])
+
+        atomic_write(path, '\n'.join(lines) + '\n')
+
+
+class EpisodeStatsWrapper(gym.Wrapper):
+    """
+    Feeds every step's info into `stats` (an `EpisodeStats`, by default a new
+    single-env one). If `prometheus_path` is given the aggregates are exported
+    there at the end of every episode.
+    """
+    def __init__(self, env, stats=None, env_id=0, prometheus_path=None):
+        super().__init__(env)
+        self.stats = EpisodeStats() if stats is None else stats
+        self.env_id = env_id
+        self.prometheus_path = prometheus_path
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        if info is None:
+            # 'lazy' reward mode, the info is computed on demand
+            info = self.env.unwrapped.last_info
+        self.stats.update(self.env_id, info, done)
+        if done and self.prometheus_path is not None:
+            self.stats.write_prometheus(self.prometheus_path)
+        return observation, reward, done, info
+
+    def step_n(self, *args, **kwargs):
+        # would skip the per-step infos the statistics are built from
+        raise TypeError('EpisodeStatsWrapper needs the info of every step, '
+                        'use step() instead of step_n()')
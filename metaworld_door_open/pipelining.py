@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import gym
+
+
+def _settings(env):
+    """Task and interface settings of the base env that a reset depends on"""
+    base = env.unwrapped
+    rand_vec = None if base._last_rand_vec is None else tuple(base._last_rand_vec)
+    return (rand_vec, base._freeze_rand_vec, base._dtype, base.info_mode,
+            base.reward_mode, base._observe_gripper, base._control_gripper,
+            base._grab_effort)
+
+
+def _copy_settings(src, dst):
+    src, dst = src.unwrapped, dst.unwrapped
+    if src._freeze_rand_vec and src._last_rand_vec is not None:
+        dst.set_rand_vec(src._last_rand_vec)
+    dst.set_dtype(src._dtype)
+    dst.set_info_mode(src.info_mode)
+    dst.set_reward_mode(src.reward_mode)
+    dst.configure_gripper(observe=src._observe_gripper, control=src._control_gripper,
+                          grab_effort=src._grab_effort)
+
+
+class DoubleBufferedEnv(gym.Wrapper):
+    """
+    Keeps a spare env whose next episode is prepared in a background thread
+    while the active env steps, so `reset()` only swaps the two.
+
+    The background reset overlaps best with time the stepping thread spends
+    outside the simulator, e.g. a vector env worker waiting for the next batch
+    of actions.
+
+    Settings changed on the active env between resets (a task switch with
+    `set_rand_vec` / `TaskPool.apply`, `set_dtype`, `set_info_mode`,
+    `set_reward_mode`, `configure_gripper`, also through `env_method`) are
+    detected on `reset()`: they are copied to the spare, whose prepared
+    episode is then discarded and reset again, so they still take effect on
+    the next reset.
+
+    env_fn: no-argument callable building an env, called twice. With a frozen
+        task both envs should be identical; when tasks are drawn on reset
+        (e.g. `TaskPoolWrapper`) seed the two calls differently.
+    """
+    def __init__(self, env_fn):
+        super().__init__(env_fn())
+        self._spare = env_fn()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._prepare_spare()
+
+    def _prepare_spare(self):
+        # settings of the active env the spare's episode was prepared for
+        self._prepared_settings = _settings(self.env)
+        self._pending = self._executor.submit(self._spare.reset)
+
+    def reset(self, **kwargs):
+        if kwargs:
+            # only argument-free resets are prepared ahead of time
+            return self.env.reset(**kwargs)
+        obs = self._pending.result()
+        if _settings(self.env) != self._prepared_settings:
+            _copy_settings(self.env, self._spare)
+            obs = self._spare.reset()
+        self.env, self._spare = self._spare, self.env
+        self.observation_space = self.env.observation_space
+        self.action_space = self.env.action_space
+        self._prepare_spare()
+        return obs
+
+    def step_n(self, *args, **kwargs):
+        return self.env.step_n(*args, **kwargs)
+
+    def close(self):
+        self._pending.result()
+        self._executor.shutdown()
+        self._spare.close()
+        return self.env.close()
@@ -79,13 +79,14 @@ class Action:
     is a dictionary. Once filled, the corresponding array is
     available as an instance variable.
     """
-    def __init__(self, structure):
+    def __init__(self, structure, dtype='float'):
         """
         Args:
             structure (dict): Map from field names to output array indices
+            dtype: dtype of the output array
         """
         self._structure = structure
-        self.array = np.zeros(len(self), dtype='float')
+        self.array = np.zeros(len(self), dtype=dtype)
 
     def __len__(self):
         return sum([1 if isinstance(idx, int) else len(idx) for idx in self._structure.items()])
@@ -100,6 +101,8 @@ class Action:
         
         
 class SawyerDoorOpenV2Policy(Policy):
+    def __init__(self, dtype='float'):
+        self.dtype = dtype
 
     @staticmethod
     @assert_fully_parsed
@@ -117,7 +120,7 @@ class SawyerDoorOpenV2Policy(Policy):
         action = Action({
             'delta_pos': np.arange(3),
             'grab_effort': 3
-        })
+        }, dtype=self.dtype)
 
         action['delta_pos'] = move(
             o_d['hand_pos'], to_xyz=self._desired_pos(o_d), p=25.)
@@ -0,0 +1,77 @@
+_SOLVERS = ('PGS', 'CG', 'Newton')
+_JACOBIANS = ('dense', 'sparse', 'auto')
+_CONES = ('pyramidal', 'elliptic')
+
+
+class SimProfile:
+    """
+    Simulation fidelity and solver settings applied on top of the loaded MjModel.
+
+    Fields left as None keep the value from the XML (see basic_scene.xml).
+    solver, jacobian and cone take the MJCF attribute values, e.g. 'CG',
+    'sparse' and 'pyramidal'.
+    """
+    def __init__(self, frame_skip=5, timestep=None, iterations=None,
+                 tolerance=None, solver=None, jacobian=None, cone=None):
+        assert solver is None or solver in _SOLVERS, solver
+        assert jacobian is None or jacobian in _JACOBIANS, jacobian
+        assert cone is None or cone in _CONES, cone
+        self.frame_skip = frame_skip
+        self.timestep = timestep
+        self.iterations = iterations
+        self.tolerance = tolerance
+        self.solver = solver
+        self.jacobian = jacobian
+        self.cone = cone
+
+    def apply(self, model):
+        """Overrides the solver options of `model` in place"""
+        opt = model.opt
+        if self.timestep is not None:
+            opt.timestep = self.timestep
+        if self.iterations is not None:
+            opt.iterations = self.iterations
+        if self.tolerance is not None:
+            opt.tolerance = self.tolerance
+        # enum values follow the order of the MJCF keywords (mjtSolver, ...)
+        if self.solver is not None:
+            opt.solver = _SOLVERS.index(self.solver)
+        if self.jacobian is not None:
+            opt.jacobian = _JACOBIANS.index(self.jacobian)
+        if self.cone is not None:
+            opt.cone = _CONES.index(self.cone)
+
+    def __repr__(self):
+        fields = ', '.join('{}={}'.format(k, v) for k, v in vars(self).items())
+        return '{}({})'.format(type(self).__name__, fields)
+
+
+# All profiles keep the control period (frame_skip * timestep = 0.0125 s) of
+# the default one, so a policy sees the same env dt and only the number of
+# physics substeps per env step or the constraint solver changes.
+SIM_PROFILES = {
+    'default': SimProfile(),
+    'fast': SimProfile(frame_skip=3, timestep=0.0125 / 3,
+                       iterations=20, tolerance=1e-8),
+    'fastest': SimProfile(frame_skip=2, timestep=0.00625,
+                          iterations=10, tolerance=1e-6),
+    'sparse': SimProfile(jacobian='sparse'),
+    'cg': SimProfile(solver='CG', jacobian='sparse',
+                     iterations=30, tolerance=1e-8),
+    'pgs_pyramidal': SimProfile(solver='PGS', jacobian='sparse',
+                                cone='pyramidal', iterations=30,
+                                tolerance=1e-6),
+}
+
+
+def get_sim_profile(profile):
+    """
+    profile: name from `SIM_PROFILES` or a `SimProfile` instance
+    """
+    if isinstance(profile, SimProfile):
+        return profile
+    try:
+        return SIM_PROFILES[profile]
+    except KeyError:
+        raise ValueError('Unknown simulation profile {!r}, expected one of {}'
+                         .format(profile, list(SIM_PROFILES))) from None
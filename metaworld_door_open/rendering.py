@@ -0,0 +1,125 @@
+"""
+Headless offscreen rendering with one OpenGL context per process.
+
+mujoco_py compiles its extension against either OSMesa (CPU) or EGL (GPU) and
+picks one when it is imported, so `select_backend` has to be called before
+the first env is built. The environment variable DOOROPEN_RENDER_BACKEND is
+applied when the package is imported.
+
+Envs do not get their own offscreen context: `SharedRenderer` copies the state
+of the env to be rendered into a render sim of the same model and draws it
+with the process-wide context.
+"""
+import ctypes.util
+import os
+import sys
+
+
+BACKENDS = ('osmesa', 'egl')
+_shared_renderer = None
+
+
+def select_backend(backend):
+    """Chooses the offscreen backend, 'osmesa' (CPU) or 'egl' (GPU).
+
+    mujoco_py only builds its EGL extension where it finds an NVIDIA driver
+    (`/usr/lib/nvidia-*`) and silently falls back to OSMesa otherwise, check
+    `active_backend()` after the first env is built.
+
+    Raises:
+        RuntimeError: if mujoco_py is already loaded with the other backend,
+            or 'egl' is requested and no libEGL is installed
+    """
+    if backend not in BACKENDS:
+        raise ValueError('Unknown render backend {!r}, choose one of {}'.format(
+            backend, ', '.join(BACKENDS)))
+    if 'mujoco_py' in sys.modules:
+        active = active_backend()
+        if active != backend:
+            raise RuntimeError('mujoco_py was already imported with the {} '
+                               'backend'.format(active))
+        return
+    if backend == 'osmesa':
+        os.environ['MUJOCO_PY_FORCE_CPU'] = '1'
+    else:
+        if ctypes.util.find_library('EGL') is None:
+            raise RuntimeError('The egl render backend needs libEGL, which was '
+                               'not found')
+        os.environ.pop('MUJOCO_PY_FORCE_CPU', None)
+
+
+def select_backend_from_env():
+    backend = os.environ.get('DOOROPEN_RENDER_BACKEND')
+    if backend:
+        select_backend(backend)
+
+
+def active_backend():
+    """Backend of the loaded mujoco_py extension, 'glfw' on non-Linux builds"""
+    import mujoco_py
+    name = os.path.basename(mujoco_py.cymj.__file__)
+    if 'linuxgpu' in name:
+        return 'egl'
+    if 'linuxcpu' in name:
+        return 'osmesa'
+    return 'glfw'
+
+
+class SharedRenderer:
+    """
+    One offscreen render context for all envs of a process.
+
+    A render sim is kept per model file and simulation profile, on the shared
+    model the envs use (`model_cache.shared_model`). The context is moved
+    between them with `update_sim`, which is only needed when envs of
+    different scenes or profiles are rendered by the same process.
+    """
+    def __init__(self, device_id=-1):
+        self.device_id = device_id
+        self.context = None
+        self.sim = None
+        self._sims = {}
+
+    def sync(self, env):
+        """Copies the state of `env` into its render sim and returns that sim"""
+        import mujoco_py
+        from .model_cache import shared_model
+        key = env.model_path, repr(env.sim_profile)
+        sim = self._sims.get(key)
+        if sim is None:
+            sim = self._sims[key] = mujoco_py.MjSim(
+                shared_model(env.model_path, env.sim_profile))
+        if self.context is None:
+            self.context = mujoco_py.MjRenderContextOffscreen(sim, device_id=self.device_id)
+        elif self.context.sim is not sim:
+            self.context.update_sim(sim)
+
+        src_model, src, dst = env.sim.model, env.sim.data, sim.data
+        dst.qpos[:] = src.qpos
+        dst.qvel[:] = src.qvel
+        if src_model.na:
+            dst.act[:] = src.act
+        if src_model.nmocap:
+            dst.mocap_pos[:] = src.mocap_pos
+            dst.mocap_quat[:] = src.mocap_quat
+        sim.forward()
+        self.sim = sim
+        return sim
+
+    def render(self, env, resolution=(640, 480), camera_name='corner2', depth=False):
+        sim = self.sync(env)
+        width, height = resolution
+        self.context.render(width, height, sim.model.camera_name2id(camera_name))
+        return self.context.read_pixels(width, height, depth=depth)
+
+    def clear_markers(self):
+        if self.context is not None:
+            self.context._markers[:] = []
+
+
+def get_shared_renderer(device_id=-1):
+    """The process-wide `SharedRenderer`, created on first use"""
+    global _shared_renderer
+    if _shared_renderer is None:
+        _shared_renderer = SharedRenderer(device_id=device_id)
+    return _shared_renderer
@@ -0,0 +1,289 @@
+"""
+Compact binary action logs and a deterministic replayer.
+
+An episode is fully determined by the env configuration, the task (door
+position) and the actions, so the log stores only those plus CRC32 checksums
+of qpos/qvel every `checksum_every` steps to detect a diverging replay.
+
+Layout (little endian):
+    file header:    MAGIC, uint32 version, uint32 n, n bytes of JSON config
+                    (the `make_env` arguments)
+    episode record: uint32 n_steps, action_dim, rand_vec_len, checksum_every,
+                    int32 exception_step (-1 if none),
+                    float64[rand_vec_len] rand_vec,
+                    float32[n_steps, action_dim] actions,
+                    uint32[n_steps // checksum_every + 1] checksums
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+import gym
+
+from .profiles import SimProfile
+
+
+MAGIC = b'DOACTLOG'
+VERSION = 1
+_FILE_HEADER = struct.Struct('<8sII')
+_EPISODE_HEADER = struct.Struct('<IIIIi')
+
+
+def state_checksum(sim):
+    """CRC32 of the qpos and qvel bytes"""
+    checksum = zlib.crc32(sim.data.qpos.tobytes())
+    return zlib.crc32(sim.data.qvel.tobytes(), checksum)
+
+
+class EpisodeRecord:
+    def __init__(self, rand_vec, actions, checksums, checksum_every,
+                 exception_step=-1):
+        self.rand_vec = rand_vec
+        self.actions = actions
+        self.checksums = checksums
+        self.checksum_every = checksum_every
+        # first step after which the recorded env had seen a sim exception
+        self.exception_step = exception_step
+
+    def __len__(self):
+        return len(self.actions)
+
+
+class ActionLogWriter:
+    """Appends episode records to `path` after writing the file header.
+
+    Raises:
+        FileExistsError: if `path` exists and `overwrite` is not set
+    """
+    def __init__(self, path, config, overwrite=False):
+        self.path = path
+        self.config = config
+        config_bytes = json.dumps(config).encode()
+        with open(path, 'wb' if overwrite else 'xb') as f:
+            f.write(_FILE_HEADER.pack(MAGIC, VERSION, len(config_bytes)))
+            f.write(config_bytes)
+
+    def write(self, record):
+        actions = np.ascontiguousarray(record.actions, dtype='<f4')
+        with open(self.path, 'ab') as f:
+            f.write(_EPISODE_HEADER.pack(len(actions), actions.shape[1],
+                                         len(record.rand_vec),
+                                         record.checksum_every,
+                                         record.exception_step))
+            f.write(np.asarray(record.rand_vec, dtype='<f8').tobytes())
+            f.write(actions.tobytes())
+            f.write(np.asarray(record.checksums, dtype='<u4').tobytes())
+
+
+def read_action_log(path):
+    """Returns the config and the list of `EpisodeRecord`s of a log"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, config_len = _FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{} is not a version {} action log'.format(path, VERSION))
+    offset = _FILE_HEADER.size
+    config = json.loads(data[offset:offset + config_len].decode())
+    offset += config_len
+
+    records = []
+    while offset < len(data):
+        n_steps, action_dim, rand_vec_len, checksum_every, exception_step = \
+            _EPISODE_HEADER.unpack_from(data, offset)
+        offset += _EPISODE_HEADER.size
+        arrays = []
+        for dtype, count in (('<f8', rand_vec_len),
+                             ('<f4', n_steps * action_dim),
+                             ('<u4', n_steps // checksum_every + 1)):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+            offset += arrays[-1].nbytes
+        rand_vec, actions, checksums = arrays
+        records.append(EpisodeRecord(rand_vec, actions.reshape(n_steps, action_dim),
+                                     checksums, checksum_every, exception_step))
+    return config, records
+
+
+class ActionRecorder(gym.Wrapper):
+    """
+    Logs every episode of `env` to `writer`. Actions are rounded to float32
+    before they reach the env, so that the log replays exactly.
+
+    An episode is written when the next one starts or on `close()`.
+    """
+    def __init__(self, env, writer, checksum_every=10):
+        super().__init__(env)
+        self.writer = writer
+        self.checksum_every = checksum_every
+        self._action_dim = env.action_space.shape[0]
+        max_steps = env.unwrapped.max_path_length + 1
+        self._actions = np.zeros((max_steps, self._action_dim), dtype=np.float32)
+        self._checksums = np.zeros(max_steps // checksum_every + 1, dtype=np.uint32)
+        self._rand_vec = None
+        self._n_steps = 0
+        self._exception_step = -1
+
+    def reset(self, **kwargs):
+        self._flush()
+        observation = self.env.reset(**kwargs)
+        base = self.env.unwrapped
+        self._rand_vec = base._last_rand_vec.copy()
+        self._n_steps = 0
+        self._exception_step = -1
+        self._checksums[0] = state_checksum(base.sim)
+        return observation
+
+    def step(self, action):
+        logged = self._actions[self._n_steps]
+        logged[:] = action
+        observation, reward, done, info = self.env.step(logged)
+        self._n_steps += 1
+
+        base = self.env.unwrapped
+        if self._exception_step < 0 and base._did_see_sim_exception:
+            self._exception_step = self._n_steps
+        if self._n_steps % self.checksum_every == 0:
+            self._checksums[self._n_steps // self.checksum_every] = \
+                state_checksum(base.sim)
+        return observation, reward, done, info
+
+    def step_n(self, actions, returns='last', obs_out=None, reward_out=None,
+               until_success=False):
+        """`SawyerXYZEnv.step_n` split at the checksum steps. A sim exception
+        is attributed to the last step before the next checksum."""
+        k = len(actions)
+        logged = self._actions[self._n_steps:self._n_steps + k]
+        logged[:] = actions
+        if returns == 'all':
+            space = self.observation_space
+            if obs_out is None:
+                obs_out = np.empty((k,) + space.shape, dtype=space.dtype)
+            if reward_out is None:
+                reward_out = np.empty(k, dtype=space.dtype)
+
+        base = self.env.unwrapped
+        n = 0
+        reward_sum = 0.
+        while n < k:
+            end = min(k, n + self.checksum_every - self._n_steps % self.checksum_every)
+            observation, reward, done, info, m = self.env.step_n(
+                logged[n:end], returns,
+                obs_out=None if obs_out is None else obs_out[n:end],
+                reward_out=None if reward_out is None else reward_out[n:end],
+                until_success=until_success)
+            reward_sum += reward if returns == 'sum' else 0.
+            self._n_steps += m
+            if self._exception_step < 0 and base._did_see_sim_exception:
+                self._exception_step = self._n_steps
+            if self._n_steps % self.checksum_every == 0:
+                self._checksums[self._n_steps // self.checksum_every] = \
+                    state_checksum(base.sim)
+            n += m
+            if m < end - (n - m):
+                # stopped on success
+                break
+
+        if returns == 'all':
+            return obs_out[:n], reward_out[:n], done, info, n
+        if returns == 'sum':
+            reward = self.observation_space.dtype.type(reward_sum)
+        return observation, reward, done, info, n
+
+    def close(self):
+        self._flush()
+        return super().close()
+
+    def _flush(self):
+        if self._rand_vec is None:
+            return
+        n = self._n_steps
+        self.writer.write(EpisodeRecord(
+            self._rand_vec, self._actions[:n],
+            self._checksums[:n // self.checksum_every + 1],
+            self.checksum_every, self._exception_step))
+        self._rand_vec = None
+
+
+def log_config(max_episode_length, seed, use_gripper, sim_profile, scene, dtype):
+    """JSON-serializable `make_env` arguments stored in the log header"""
+    if isinstance(sim_profile, SimProfile):
+        sim_profile = vars(sim_profile)
+    return {
+        'max_episode_length': max_episode_length,
+        'seed': seed,
+        'use_gripper': use_gripper,
+        'sim_profile': sim_profile,
+        'scene': scene,
+        'dtype': np.dtype(dtype).name,
+    }
+
+
+def make_replay_env(config):
+    """Builds the env a log was recorded with"""
+    from .factory import make_env
+    config = dict(config)
+    if isinstance(config['sim_profile'], dict):
+        config['sim_profile'] = SimProfile(**config['sim_profile'])
+    config['dtype'] = np.dtype(config['dtype'])
+    return make_env(**config)
+
+
+def _start(env, record):
+    base = env.unwrapped
+    base.set_rand_vec(record.rand_vec)
+    base.reset()
+    return base
+
+
+def find_divergence(env, record):
+    """Re-simulates `record` and compares the checksums.
+
+    Returns:
+        (int or None): step of the first mismatching checksum, the first
+            divergent step is in `(step - record.checksum_every, step]`
+            (0 if already the reset state differs)
+        int: first step after which the replay saw a sim exception, -1 if none
+    """
+    base = _start(env, record)
+    if state_checksum(base.sim) != record.checksums[0]:
+        return 0, -1
+    k = record.checksum_every
+    exception_step = -1
+    for t, action in enumerate(record.actions, 1):
+        base.step(action)
+        if exception_step < 0 and base._did_see_sim_exception:
+            exception_step = t
+        if t % k == 0 and state_checksum(base.sim) != record.checksums[t // k]:
+            return t, exception_step
+    return None, exception_step
+
+
+def dump_states(env, record, first, last, path):
+    """Re-simulates `record` and saves the full sim state after each step in
+    `[first, last]` (step 0 is the reset state) to the npz file `path`"""
+    base = _start(env, record)
+    first, last = max(first, 0), min(last, len(record))
+    names = ('step', 'time', 'qpos', 'qvel', 'act', 'ctrl', 'mocap_pos',
+             'mocap_quat', 'action')
+    states = {name: [] for name in names}
+
+    def save(t):
+        state = base.sim.get_state()
+        states['step'].append(t)
+        states['time'].append(state.time)
+        states['qpos'].append(state.qpos.copy())
+        states['qvel'].append(state.qvel.copy())
+        states['act'].append(np.zeros(0) if state.act is None else state.act.copy())
+        states['ctrl'].append(base.data.ctrl.copy())
+        states['mocap_pos'].append(base.data.mocap_pos.copy())
+        states['mocap_quat'].append(base.data.mocap_quat.copy())
+        states['action'].append(record.actions[t - 1] if t > 0
+                                else np.full(record.actions.shape[1], np.nan))
+
+    if first == 0:
+        save(0)
+    for t in range(1, last + 1):
+        base.step(record.actions[t - 1])
+        if t >= first:
+            save(t)
+    np.savez(path, **{name: np.array(values) for name, values in states.items()})
@@ -0,0 +1,5 @@
+def print_table(header, rows):
+    """Prints `rows` below `header` as right-aligned columns"""
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    for row in [header] + rows:
+        print('  '.join(str(x).rjust(w) for x, w in zip(row, widths)))
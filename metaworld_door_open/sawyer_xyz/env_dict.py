@@ -1,8 +1,6 @@
 from collections import OrderedDict
 import re
 
-import numpy as np
-
 
 from .sawyer_door_v2 import SawyerDoorEnvV2
 
@@ -17,18 +15,23 @@ def create_hidden_goal_envs():
     for env_name, env_cls in ALL_V2_ENVIRONMENTS.items():
         d = {}
 
-        def initialize(env, seed=None):
+        def initialize(env, seed=None, rand_vec=None, **kwargs):
+            super(type(env), env).__init__(**kwargs)
+
             if seed is not None:
-                st0 = np.random.get_state()
-                np.random.seed(seed)
-            super(type(env), env).__init__()
+                # the env's own generator, the global NumPy RNG is left alone
+                # so envs can be built from several threads
+                env.seed(seed)
+
             env._partially_observable = True
-            env._freeze_rand_vec = False
             env._set_task_called = True
-            env.reset()
-            env._freeze_rand_vec = True
-            if seed is not None:
-                np.random.set_state(st0)
+            if rand_vec is not None:
+                env.set_rand_vec(rand_vec)
+                env.reset()
+            else:
+                env._freeze_rand_vec = False
+                env.reset()
+                env._freeze_rand_vec = True
 
         d['__init__'] = initialize
         hg_env_name = re.sub("(^|[-])\s*([a-zA-Z])",
@@ -47,18 +50,23 @@ def create_observable_goal_envs():
     for env_name, env_cls in ALL_V2_ENVIRONMENTS.items():
         d = {}
 
-        def initialize(env, seed=None):
-            super(type(env), env).__init__()
+        def initialize(env, seed=None, rand_vec=None, **kwargs):
+            super(type(env), env).__init__(**kwargs)
             
             if seed is not None:
                 # should be called after __init__() and before reset()
                 env.seed(seed)
                 
             env._partially_observable = False
-            env._freeze_rand_vec = False
             env._set_task_called = True
-            env.reset()
-            env._freeze_rand_vec = True
+            if rand_vec is not None:
+                # task given explicitly (e.g. by a `TaskPool`), skip sampling
+                env.set_rand_vec(rand_vec)
+                env.reset()
+            else:
+                env._freeze_rand_vec = False
+                env.reset()
+                env._freeze_rand_vec = True
 
         d['__init__'] = initialize
         og_env_name = re.sub("(^|[-])\s*([a-zA-Z])",
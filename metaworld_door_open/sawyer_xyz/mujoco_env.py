@@ -1,18 +1,20 @@
 import abc
 import warnings
 
-import glfw
 from gym import error
 from gym.utils import seeding
 import numpy as np
 from os import path
 import gym
 
+from ..rendering import get_shared_renderer
 try:
     import mujoco_py
 except ImportError as e:
     raise error.DependencyNotInstalled("{}. (HINT: you need to install mujoco_py, and also perform the setup instructions here: https://github.com/openai/mujoco-py/.)".format(e))
 
+from ..model_cache import load_model, shared_model
+
 
 def _assert_task_is_set(func):
     def inner(*args, **kwargs):
@@ -38,12 +40,20 @@ class MujocoEnv(gym.Env, abc.ABC):
 
     max_path_length = 500
 
-    def __init__(self, model_path, frame_skip):
+    def __init__(self, model_path, frame_skip, sim_profile=None, share_model=True):
         if not path.exists(model_path):
             raise IOError("File %s does not exist" % model_path)
 
         self.frame_skip = frame_skip
-        self.model = mujoco_py.load_model_from_path(model_path)
+        self.model_path = model_path
+        self.sim_profile = sim_profile
+        if share_model:
+            # read-only, shared with all envs of the process built alike
+            self.model = shared_model(model_path, sim_profile)
+        else:
+            self.model = load_model(model_path)
+            if sim_profile is not None:
+                sim_profile.apply(self.model)
         self.sim = mujoco_py.MjSim(self.model)
         self.data = self.sim.data
         self.viewer = None
@@ -134,14 +144,16 @@ class MujocoEnv(gym.Env, abc.ABC):
         if not offscreen:
             self._get_viewer('human').render()
         else:
-            return self.sim.render(
-                *resolution,
-                mode='offscreen',
-                camera_name=camera_name
-            )
+            # one offscreen context per process, see `rendering`
+            return get_shared_renderer().render(
+                self, resolution=resolution, camera_name=camera_name)
 
     def close(self):
         if self.viewer is not None:
+            # only the on-screen viewer uses glfw directly. mujoco_py has
+            # already loaded it (mujoco_py.mjviewer), so this is not about
+            # import time
+            import glfw
             glfw.destroy_window(self.viewer.window)
             self.viewer = None
 
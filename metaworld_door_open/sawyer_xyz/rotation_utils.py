@@ -0,0 +1,46 @@
+"""Rotation helpers that avoid importing scipy on the stepping path"""
+
+import numpy as np
+
+
+def mat2quat(mat):
+    """Converts rotation matrices to scalar-last quaternions.
+
+    Same algorithm (and hence the same quaternion sign) as
+    `scipy.spatial.transform.Rotation.from_matrix(mat).as_quat()`.
+
+    Args:
+        mat (np.ndarray): (..., 3, 3) rotation matrices
+
+    Returns:
+        np.ndarray: (..., 4) quaternions (x, y, z, w)
+    """
+    mat = np.asarray(mat, dtype=np.float64)
+    batch_shape = mat.shape[:-2]
+    mat = mat.reshape(-1, 3, 3)
+    n = len(mat)
+
+    decision = np.empty((n, 4))
+    decision[:, :3] = mat.diagonal(axis1=1, axis2=2)
+    decision[:, 3] = decision[:, :3].sum(axis=1)
+    choices = decision.argmax(axis=1)
+
+    quat = np.empty((n, 4))
+
+    ind = np.nonzero(choices != 3)[0]
+    i = choices[ind]
+    j = (i + 1) % 3
+    k = (j + 1) % 3
+    quat[ind, i] = 1 - decision[ind, 3] + 2 * mat[ind, i, i]
+    quat[ind, j] = mat[ind, j, i] + mat[ind, i, j]
+    quat[ind, k] = mat[ind, k, i] + mat[ind, i, k]
+    quat[ind, 3] = mat[ind, k, j] - mat[ind, j, k]
+
+    ind = np.nonzero(choices == 3)[0]
+    quat[ind, 0] = mat[ind, 2, 1] - mat[ind, 1, 2]
+    quat[ind, 1] = mat[ind, 0, 2] - mat[ind, 2, 0]
+    quat[ind, 2] = mat[ind, 1, 0] - mat[ind, 0, 1]
+    quat[ind, 3] = 1 + decision[ind, 3]
+
+    quat /= np.linalg.norm(quat, axis=1)[:, None]
+    return quat.reshape(batch_shape + (4,))
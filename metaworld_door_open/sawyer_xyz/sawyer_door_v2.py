@@ -1,20 +1,32 @@
-from pathlib import Path
-
 import numpy as np
 from gym.spaces import Box
-from scipy.spatial.transform import Rotation
 
 from . import reward_utils
+from ..scenes import SCENES, scene_path
+from ..start_states import (ARM_JOINTS, GRIPPER_JOINTS, check_hand_orientation,
+                            set_gripper, solve_hand_ik)
+from .rotation_utils import mat2quat
 from .sawyer_xyz_env import SawyerXYZEnv, _assert_task_is_set
 
 
 class SawyerDoorEnvV2(SawyerXYZEnv):
-    def __init__(self):
-
-        hand_low = (-0.5, 0.40, 0.05)
-        hand_high = (0.5, 1, 0.5)
-        obj_low = (0., 0.85, 0.15)
-        obj_high = (0.1, 0.95, 0.15)
+    # bounds of the door position sampled on reset (`_random_reset_space`)
+    OBJ_LOW = (0., 0.85, 0.15)
+    OBJ_HIGH = (0.1, 0.95, 0.15)
+    # hand workspace (also the mocap bounds) and reset position
+    HAND_LOW = (-0.5, 0.40, 0.05)
+    HAND_HIGH = (0.5, 1, 0.5)
+    HAND_INIT_POS = (0, 0.6, 0.2)
+    # goal position relative to the door
+    GOAL_OFFSET = (-0.3, -0.45, 0.)
+
+    def __init__(self, sim_profile=None, scene='default', share_model=True):
+        self.scene = scene
+
+        hand_low = self.HAND_LOW
+        hand_high = self.HAND_HIGH
+        obj_low = self.OBJ_LOW
+        obj_high = self.OBJ_HIGH
         goal_low = (-.3, 0.4, 0.1499)
         goal_high = (-.2, 0.5, 0.1501)
 
@@ -22,12 +34,23 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
             self.model_name,
             hand_low=hand_low,
             hand_high=hand_high,
+            sim_profile=sim_profile,
+            share_model=share_model,
         )
 
+        # door and goal are placed through mocap so the model is never written
+        self._door_mocap_id = self.model.body_mocapid[self.model.body_name2id('door')]
+        if self._door_mocap_id < 0:
+            raise ValueError('Scene {!r} predates mocap door placement, regenerate it '
+                             'with `{}`'.format(scene, SCENES[scene][1]))
+        self._goal_mocap_id = self.model.body_mocapid[self.model.body_name2id('goal')]
+        # door position of the previous episode, None before the first reset
+        self._last_door_pos = None
+
         self.init_config = {
             'obj_init_angle': np.array([0.3, ]),
             'obj_init_pos': np.array([0.1, 0.95, 0.15]),
-            'hand_init_pos': np.array([0, 0.6, 0.2]),
+            'hand_init_pos': np.array(self.HAND_INIT_POS),
         }
 
         self.goal = np.array([-0.2, 0.7, 0.15])
@@ -36,6 +59,7 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
         self.hand_init_pos = self.init_config['hand_init_pos']
 
         self.door_angle_idx = self.model.get_joint_qpos_addr('doorjoint')
+        self._door_angle_range = self.model.jnt_range[self.model.joint_name2id('doorjoint')]
         
 
         self._random_reset_space = Box(
@@ -46,8 +70,7 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
 
     @property
     def model_name(self):
-        
-        return (Path(__file__).parents[1] / 'assets/sawyer_door_pull.xml').as_posix()
+        return scene_path(self.scene)
 
     @_assert_task_is_set
     def evaluate_state(self, obs, action):
@@ -60,15 +83,15 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
 
         success = float(abs(obs[4] - self._target_pos[0]) <= 0.08)
 
-        info = {
-            'success': success,
-            'near_object': reward_ready,
-            'grasp_success': reward_grab >= 0.5,
-            'grasp_reward': reward_grab,
-            'in_place_reward': reward_success,
-            'obj_to_target': 0,
-            'unscaled_reward': reward,
-        }
+        info = self._make_info(
+            success=success,
+            near_object=reward_ready,
+            grasp_success=reward_grab >= 0.5,
+            grasp_reward=reward_grab,
+            in_place_reward=reward_success,
+            obj_to_target=0,
+            unscaled_reward=reward,
+        )
 
         return reward, info
 
@@ -80,7 +103,7 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
         return self.data.get_geom_xpos('handle').copy()
 
     def _get_quat_objects(self):
-        return Rotation.from_matrix(self.data.get_geom_xmat('handle')).as_quat()
+        return mat2quat(self.data.get_geom_xmat('handle'))
 
     def _set_obj_xyz(self, pos):
         qpos = self.data.qpos.copy()
@@ -90,22 +113,64 @@ class SawyerDoorEnvV2(SawyerXYZEnv):
         self.set_state(qpos.flatten(), qvel.flatten())
 
     def reset_model(self):
+        # the hand settles with the door where the previous episode left it
+        # (`sim.reset()` put the mocap back to the XML pose), as it did when
+        # the door was moved by writing the model
+        if self._last_door_pos is not None:
+            self.data.mocap_pos[self._door_mocap_id] = self._last_door_pos
+            self.data.mocap_pos[self._goal_mocap_id] = self._target_pos
         self._reset_hand()
 
         self.objHeight = self.data.get_geom_xpos('handle')[2]
 
         self.obj_init_pos = self._get_state_rand_vec() if self.random_init \
             else self.init_config['obj_init_pos']
-        self._target_pos = self.obj_init_pos + np.array([-0.3, -0.45, 0.])
+        self._target_pos = self.obj_init_pos + np.array(self.GOAL_OFFSET)
 
-        self.sim.model.body_pos[self.model.body_name2id('door')] = self.obj_init_pos
-        self.sim.model.site_pos[self.model.site_name2id('goal')] = self._target_pos
+        self.data.mocap_pos[self._door_mocap_id] = self.obj_init_pos
+        self.data.mocap_pos[self._goal_mocap_id] = self._target_pos
+        self._last_door_pos = self.obj_init_pos
         self._set_obj_xyz(0)
         self.maxPullDist = np.linalg.norm(self.data.get_geom_xpos('handle')[:-1] - self._target_pos[:-1])
         self.target_reward = 1000*self.maxPullDist + 1000*2
 
         return self._get_obs()
 
+    def set_start_state(self, hand_pos=None, door_angle=0., grip=-1.):
+        """Moves the hand to `hand_pos` (default `hand_init_pos`), opens the
+        door to `door_angle` (negative is open) and sets the gripper to the
+        action `grip`, without simulating. Call it after `reset()`.
+
+        The arm joints come from `start_states.solve_hand_ik`, the state is
+        made consistent with one `forward()` and has zero velocities.
+
+        Returns:
+            np.ndarray: observation of the new state
+        """
+        m, d = self.model, self.data
+        hand_pos = self.hand_init_pos if hand_pos is None else \
+            np.clip(hand_pos, self.mocap_low, self.mocap_high)
+        d.qvel[:] = 0.
+        d.qacc_warmstart[:] = 0.
+        d.qpos[self.door_angle_idx] = np.clip(door_angle, *self._door_angle_range)
+        d.mocap_pos[self._hand_mocap_id] = hand_pos
+        d.mocap_quat[self._hand_mocap_id] = np.array([1, 0, 1, 0])
+
+        gripper_joints = [m.joint_name2id(name) for name in GRIPPER_JOINTS]
+        gripper_ctrl = [np.flatnonzero(m.actuator_trnid[:, 0] == joint)[0]
+                        for joint in gripper_joints]
+        set_gripper(self.sim, gripper_joints, gripper_ctrl, grip)
+        hand_body = m.body_name2id('hand')
+        solve_hand_ik(self.sim, [hand_body],
+                      [[m.joint_name2id(name) for name in ARM_JOINTS]],
+                      np.asarray(hand_pos)[None])
+        self.sim.forward()
+        check_hand_orientation(self.sim, [hand_body], [self._hand_mocap_id])
+
+        self.init_tcp = self.tcp_center
+        self._prev_obs = self._get_curr_obs_combined_no_goal()
+        return self._get_obs()
+
     @staticmethod
     def _reward_grab_effort(actions):
         return (np.clip(actions[3], -1, 1) + 1.0) / 2.0
@@ -8,6 +8,8 @@ import mujoco_py
 import numpy as np
 
 from . import reward_utils
+from ..profiles import get_sim_profile
+from ..spec import INFO_DTYPE
 from .mujoco_env import MujocoEnv, _assert_task_is_set
 
 
@@ -19,8 +21,11 @@ class SawyerMocapBase(MujocoEnv, metaclass=abc.ABCMeta):
     mocap_low = np.array([-0.2, 0.5, 0.06])
     mocap_high = np.array([0.2, 0.7, 0.6])
 
-    def __init__(self, model_name, frame_skip=5):
-        MujocoEnv.__init__(self, model_name, frame_skip=frame_skip)
+    def __init__(self, model_name, frame_skip=5, sim_profile=None,
+                 share_model=True):
+        MujocoEnv.__init__(self, model_name, frame_skip=frame_skip,
+                           sim_profile=sim_profile, share_model=share_model)
+        self._hand_mocap_id = self.model.body_mocapid[self.model.body_name2id('mocap')]
         self.reset_mocap_welds()
 
     def get_endeff_pos(self):
@@ -48,8 +53,8 @@ class SawyerMocapBase(MujocoEnv, metaclass=abc.ABCMeta):
         joint_state, mocap_state = state
         self.sim.set_state(joint_state)
         mocap_pos, mocap_quat = mocap_state
-        self.data.set_mocap_pos('mocap', mocap_pos)
-        self.data.set_mocap_quat('mocap', mocap_quat)
+        self.data.mocap_pos[:] = mocap_pos
+        self.data.mocap_quat[:] = mocap_quat
         self.sim.forward()
 
     def __getstate__(self):
@@ -68,13 +73,18 @@ class SawyerMocapBase(MujocoEnv, metaclass=abc.ABCMeta):
         self.set_env_state(state['env_state'])
 
     def reset_mocap_welds(self):
-        """Resets the mocap welds that we use for actuation."""
+        """Resets the mocap welds that we use for actuation.
+
+        The scene XML sets this relative pose already, so the (shared) model
+        is only written for scenes that do not.
+        """
         sim = self.sim
+        weld = np.array([0., 0., 0., 1., 0., 0., 0.])
         if sim.model.nmocap > 0 and sim.model.eq_data is not None:
             for i in range(sim.model.eq_data.shape[0]):
-                if sim.model.eq_type[i] == mujoco_py.const.EQ_WELD:
-                    sim.model.eq_data[i, :] = np.array(
-                        [0., 0., 0., 1., 0., 0., 0.])
+                if sim.model.eq_type[i] == mujoco_py.const.EQ_WELD and \
+                        not np.array_equal(sim.model.eq_data[i], weld):
+                    sim.model.eq_data[i, :] = weld
         sim.forward()
 
 
@@ -97,8 +107,14 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
             mocap_high=None,
             action_scale=1./100,
             action_rot_scale=1.,
+            sim_profile=None,
+            share_model=True,
     ):
-        super().__init__(model_name, frame_skip=frame_skip)
+        if sim_profile is not None:
+            sim_profile = get_sim_profile(sim_profile)
+            frame_skip = sim_profile.frame_skip
+        super().__init__(model_name, frame_skip=frame_skip,
+                         sim_profile=sim_profile, share_model=share_model)
         self.random_init = True
         self.action_scale = action_scale
         self.action_rot_scale = action_rot_scale
@@ -124,17 +140,31 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
         self.init_left_pad = self.get_body_com('leftpad')
         self.init_right_pad = self.get_body_com('rightpad')
 
-        self.action_space = Box(
-            np.array([-1, -1, -1, -1]),
-            np.array([+1, +1, +1, +1]),
-        )
-
         self.isV2 = "V2" in type(self).__name__
         # Technically these observation lengths are different between v1 and v2,
         # but we handle that elsewhere and just stick with v2 numbers here
         self._obs_obj_max_len = 14 if self.isV2 else 6
         self._obs_obj_possible_lens = (6, 14)
 
+        # dtype of observations, rewards and spaces, see `set_dtype`
+        self._dtype = np.dtype(np.float64)
+        # Gripper interface, see `configure_gripper`
+        self._observe_gripper = True
+        self._control_gripper = True
+        self._grab_effort = -1.
+        self._action_buf = np.zeros(4)
+        # full-precision, full-layout observation used for rewards
+        self._obs_scratch = np.zeros(2 * (4 + self._obs_obj_max_len) + 3)
+        self._full_obs = None
+        # reused info record, None in the default 'dict' mode
+        self._info_record = None
+        # deferred reward evaluation, see `set_reward_mode`
+        self._lazy_reward = False
+        self._pending_action = np.zeros(4)
+        self._last_evaluation = None
+
+        self.action_space = self._make_action_space()
+
         self._set_task_called = False
         self._partially_observable = True
 
@@ -167,18 +197,154 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
         self._set_task_inner(**data)
         self.reset()
 
+    def set_rand_vec(self, rand_vec):
+        """Freezes the task parameters (e.g. the door position) to `rand_vec`.
+
+        Cheap alternative to `set_task`: nothing is reloaded and no reset is
+        done, the new task takes effect on the next `reset()`.
+        """
+        rand_vec = np.asarray(rand_vec, dtype=np.float64)
+        assert rand_vec.shape == self._random_reset_space.low.shape
+        self._last_rand_vec = rand_vec.copy()
+        self._freeze_rand_vec = True
+
+    def configure_gripper(self, observe=None, control=None, grab_effort=None):
+        """Switches between the full and the reduced (no gripper) interface.
+
+        Arguments left as None keep their current setting.
+
+        Args:
+            observe (bool): If False, the gripper distance (obs[3]) is left out
+                of the observation, which then has 38 elements instead of 39
+            control (bool): If False, actions are 3-element xyz deltas and the
+                gripper is held at `grab_effort`
+            grab_effort (float): Gripper effort used while `control` is False
+        """
+        assert self.isV2, 'Only V2 environments observe the gripper'
+        if observe is not None:
+            self._observe_gripper = observe
+        if control is not None:
+            self._control_gripper = control
+            self.action_space = self._make_action_space()
+        if grab_effort is not None:
+            self._grab_effort = grab_effort
+
+    def set_dtype(self, dtype):
+        """Sets the dtype of observations, rewards and declared spaces.
+
+        Rewards and success are still computed in full precision, float32
+        observations are written once from the simulator readout.
+        """
+        self._dtype = np.dtype(dtype)
+        self.action_space = self._make_action_space()
+
+    def set_info_mode(self, mode):
+        """Selects what `step()` returns as info.
+
+        Args:
+            mode (str): 'dict' (default) for a new dict every step, 'record'
+                for a 0-d structured array of `INFO_DTYPE` that is overwritten
+                in place on every step (copy it to keep the values)
+        """
+        assert mode in ('dict', 'record'), mode
+        self._info_record = np.zeros((), dtype=INFO_DTYPE) if mode == 'record' else None
+
+    @property
+    def info_mode(self):
+        return 'dict' if self._info_record is None else 'record'
+
+    def set_reward_mode(self, mode):
+        """Selects when rewards and infos are computed.
+
+        Args:
+            mode (str): 'eager' (default) to compute them on every step,
+                'lazy' to skip them, `step()` then returns NaN as reward and
+                None as info (as does `step_n(..., 'last')`), and
+                `last_reward` / `last_info` compute them for the last step on
+                first access (until the next step or reset). Wrappers that
+                need the info (`EpisodeStatsWrapper`) pull it from there
+        """
+        assert mode in ('eager', 'lazy'), mode
+        self._lazy_reward = mode == 'lazy'
+        self._last_evaluation = None
+
+    @property
+    def reward_mode(self):
+        return 'lazy' if self._lazy_reward else 'eager'
+
+    def evaluate_last(self):
+        """Reward and info of the last step, computed once on demand in the
+        'lazy' reward mode"""
+        if self._last_evaluation is None:
+            assert self.curr_path_length > 0, 'No step to evaluate'
+            self._last_evaluation = self.evaluate_state(self._full_obs, self._pending_action)
+        return self._last_evaluation
+
+    @property
+    def last_reward(self):
+        return self._dtype.type(self.evaluate_last()[0])
+
+    @property
+    def last_info(self):
+        return self.evaluate_last()[1]
+
+    @property
+    def sim_error(self):
+        """True once the simulator raised in this episode, steps then repeat
+        the last stable observation with a zero reward and info"""
+        return self._did_see_sim_exception
+
+    def _sim_error_info(self):
+        # dict infos are flagged, the record has no field for it
+        info = self._make_info(False, 0.0, False, 0.0, 0.0, 0.0, 0.0)
+        if isinstance(info, dict):
+            info['sim_error'] = True
+        return info
+
+    def _make_info(self, success, near_object, grasp_success, grasp_reward,
+                   in_place_reward, obj_to_target, unscaled_reward):
+        record = self._info_record
+        if record is None:
+            return {
+                'success': success,
+                'near_object': near_object,
+                'grasp_success': grasp_success,
+                'grasp_reward': grasp_reward,
+                'in_place_reward': in_place_reward,
+                'obj_to_target': obj_to_target,
+                'unscaled_reward': unscaled_reward,
+            }
+        record['success'] = success
+        record['near_object'] = near_object
+        record['grasp_success'] = grasp_success
+        record['grasp_reward'] = grasp_reward
+        record['in_place_reward'] = in_place_reward
+        record['obj_to_target'] = obj_to_target
+        record['unscaled_reward'] = unscaled_reward
+        return record
+
+    def _make_action_space(self):
+        n = 4 if self._control_gripper else 3
+        return Box(np.full(n, -1.), np.full(n, +1.), dtype=self._dtype)
+
+    def _expand_action(self, action):
+        """Pads a 3-element xyz action with the fixed grab effort"""
+        full_action = self._action_buf
+        full_action[:3] = action[:3]
+        full_action[3] = self._grab_effort
+        return full_action
+
     def set_xyz_action(self, action):
         action = np.clip(action, -1, 1)
         pos_delta = action * self.action_scale
-        new_mocap_pos = self.data.mocap_pos + pos_delta[None]
-
-        new_mocap_pos[0, :] = np.clip(
-            new_mocap_pos[0, :],
+        # the scene has further mocap bodies (door, goal) besides the hand
+        hand = self._hand_mocap_id
+        self.data.mocap_pos[hand] = np.clip(
+            self.data.mocap_pos[hand] + pos_delta,
             self.mocap_low,
             self.mocap_high,
         )
-        self.data.set_mocap_pos('mocap', new_mocap_pos)
-        self.data.set_mocap_quat('mocap', np.array([1, 0, 1, 0]))
+        self.data.mocap_quat[hand] = np.array([1, 0, 1, 0])
 
     def discretize_goal_space(self, goals):
         assert False
@@ -365,10 +531,24 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
             pos_goal = np.zeros_like(pos_goal)
         curr_obs = self._get_curr_obs_combined_no_goal()
         # do frame stacking
-        if self.isV2:
-            obs = np.hstack((curr_obs, self._prev_obs, pos_goal))
-        else:
+        if not self.isV2:
             obs = np.hstack((curr_obs, pos_goal))
+        else:
+            # fill the scratch buffer in place and write the returned
+            # observation from it, `_full_obs` is kept for reward evaluation
+            # and never handed out, so callers cannot change a lazy reward
+            full_obs = self._full_obs = self._obs_scratch
+            n = len(curr_obs)
+            full_obs[:n] = curr_obs
+            full_obs[n:2 * n] = self._prev_obs
+            full_obs[2 * n:] = pos_goal
+            if self._observe_gripper:
+                obs = full_obs.astype(self._dtype)
+            else:
+                # drop the gripper distance, obs[3]
+                obs = np.empty(len(full_obs) - 1, dtype=self._dtype)
+                obs[:3] = full_obs[:3]
+                obs[3:] = full_obs[4:]
         self._prev_obs = curr_obs
         return obs
 
@@ -393,16 +573,23 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
         gripper_low = -1.
         gripper_high = +1.
 
-        return Box(
-            np.hstack((self._HAND_SPACE.low, gripper_low, obj_low, self._HAND_SPACE.low, gripper_low, obj_low, goal_low)),
-            np.hstack((self._HAND_SPACE.high, gripper_high, obj_high, self._HAND_SPACE.high, gripper_high, obj_high, goal_high))
-        ) if self.isV2 else Box(
-            np.hstack((self._HAND_SPACE.low, obj_low, goal_low)),
-            np.hstack((self._HAND_SPACE.high, obj_high, goal_high))
-        )
+        if not self.isV2:
+            return Box(
+                np.hstack((self._HAND_SPACE.low, obj_low, goal_low)),
+                np.hstack((self._HAND_SPACE.high, obj_high, goal_high)),
+                dtype=self._dtype,
+            )
+
+        low = np.hstack((self._HAND_SPACE.low, gripper_low, obj_low, self._HAND_SPACE.low, gripper_low, obj_low, goal_low))
+        high = np.hstack((self._HAND_SPACE.high, gripper_high, obj_high, self._HAND_SPACE.high, gripper_high, obj_high, goal_high))
+        if not self._observe_gripper:
+            low, high = np.delete(low, 3), np.delete(high, 3)
+        return Box(low, high, dtype=self._dtype)
 
     @_assert_task_is_set
     def step(self, action):
+        if not self._control_gripper:
+            action = self._expand_action(action)
         self.set_xyz_action(action[:3])
         self.do_simulation([action[-1], -action[-1]])
         self.curr_path_length += 1
@@ -413,19 +600,17 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
             self._set_pos_site(*site)
 
         if self._did_see_sim_exception:
+            info = self._sim_error_info()
+            self._last_evaluation = 0.0, info
+            if self._lazy_reward:
+                # same contract as a regular lazy step, the zero reward and
+                # info are in `last_reward` / `last_info`
+                return self._last_stable_obs, self._dtype.type(np.nan), False, None
             return (
                 self._last_stable_obs,  # observation just before going unstable
-                0.0,  # reward (penalize for causing instability)
+                self._dtype.type(0.0),  # reward (penalize for causing instability)
                 False,  # termination flag always False
-                {  # info
-                    'success': False,
-                    'near_object': 0.0,
-                    'grasp_success': False,
-                    'grasp_reward': 0.0,
-                    'in_place_reward': 0.0,
-                    'obj_to_target': 0.0,
-                    'unscaled_reward': 0.0,
-                }
+                info,
             )
 
         self._last_stable_obs = self._get_obs()
@@ -436,8 +621,102 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
             # this does
             return self._last_stable_obs
 
-        reward, info = self.evaluate_state(self._last_stable_obs, action)
-        return self._last_stable_obs, reward, False, info
+        if self._lazy_reward:
+            self._defer_evaluation(action)
+            return self._last_stable_obs, self._dtype.type(np.nan), False, None
+
+        # rewards are defined on the full observation layout
+        reward, info = self._last_evaluation = self.evaluate_state(self._full_obs, action)
+        return self._last_stable_obs, self._dtype.type(reward), False, info
+
+    def step_n(self, actions, returns='last', obs_out=None, reward_out=None,
+               until_success=False):
+        """Runs the control steps `actions` (k, action_dim) in one call.
+
+        Same dynamics as calling `step()` k times, but observations and
+        rewards are only computed where they are returned:
+            'last': observation, reward and info of the last step
+            'sum': observation and info of the last step, rewards summed
+            'all': observations and rewards of every step, written to
+                `obs_out` (k, obs_dim) and `reward_out` (k,) if given
+        Target sites are placed once after the last step. After a sim
+        exception the last computed observation is returned, with a zero
+        reward and `info['sim_error']` set (see `sim_error`).
+
+        Args:
+            until_success (bool): stop after the first successful step
+
+        Returns:
+            observation(s), reward(s), done (always False), info of the last
+            step run, number of steps run
+        """
+        if not self._set_task_called:
+            raise RuntimeError('You must call env.set_task before using env.step_n')
+        assert self.isV2
+        assert returns in ('last', 'sum', 'all'), returns
+        k = len(actions)
+        assert k > 0
+        each_obs = returns == 'all'
+        each_reward = returns != 'last' or until_success
+        if each_obs:
+            if obs_out is None:
+                obs_out = np.empty((k,) + self.observation_space.shape, dtype=self._dtype)
+            if reward_out is None:
+                reward_out = np.empty(k, dtype=self._dtype)
+
+        reward = reward_sum = 0.
+        info = None
+        n = 0
+        while n < k:
+            action = actions[n]
+            n += 1
+            if not self._control_gripper:
+                action = self._expand_action(action)
+            self.set_xyz_action(action[:3])
+            self.do_simulation([action[-1], -action[-1]])
+            self.curr_path_length += 1
+
+            if self._did_see_sim_exception:
+                reward = 0.
+                info = self._sim_error_info()
+                self._last_evaluation = reward, info
+                if self._lazy_reward and not each_reward:
+                    reward, info = np.nan, None
+                if each_obs:
+                    obs_out[n - 1] = self._last_stable_obs
+                    reward_out[n - 1] = reward
+                continue
+            if not (each_reward or each_obs or n == k):
+                # only keep the frame stack up to date
+                self._prev_obs = self._get_curr_obs_combined_no_goal()
+                continue
+
+            self._last_stable_obs = self._get_obs()
+            if self._lazy_reward and not each_reward:
+                self._defer_evaluation(action)
+                reward, info = np.nan, None
+            elif each_reward or n == k:
+                reward, info = self._last_evaluation = \
+                    self.evaluate_state(self._full_obs, action)
+                reward_sum += reward
+            if each_obs:
+                obs_out[n - 1] = self._last_stable_obs
+                reward_out[n - 1] = reward
+            if until_success and info['success']:
+                break
+
+        for site in self._target_site_config:
+            self._set_pos_site(*site)
+
+        if each_obs:
+            return obs_out[:n], reward_out[:n], False, info, n
+        if returns == 'sum':
+            reward = reward_sum
+        return self._last_stable_obs, self._dtype.type(reward), False, info, n
+
+    def _defer_evaluation(self, action):
+        self._pending_action[:len(action)] = action
+        self._last_evaluation = None
 
     def evaluate_state(self, obs, action):
         """Does the heavy-lifting for `step()` -- namely, calculating reward
@@ -456,6 +735,7 @@ class SawyerXYZEnv(SawyerMocapBase, metaclass=abc.ABCMeta):
 
     def reset(self):
         self.curr_path_length = 0
+        self._last_evaluation = None
         return super().reset()
 
     def _reset_hand(self, steps=50):
@@ -0,0 +1,278 @@
+"""
+Scene variants and MJCF helpers used to generate them.
+
+Variants are written next to the original scene by the tools in `tools/` and
+selected with `make_dooropen_env(..., scene=name)`.
+"""
+import copy
+import math
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+from .fileutils import CACHE_DIR, atomic_write, stat_digest
+
+
+ASSETS_DIR = Path(__file__).parent / 'assets'
+
+# name -> (file in ASSETS_DIR, command that generates it)
+SCENES = {
+    'default': ('sawyer_door_pull.xml', None),
+    'lite': ('sawyer_door_pull_lite.xml', 'python -m tools.build_collision_meshes'),
+    'pruned': ('sawyer_door_pull_pruned.xml', 'python -m tools.prune_contacts'),
+}
+
+# MuJoCo's built-in geom defaults that matter for collision filtering
+_GEOM_DEFAULTS = {'contype': '1', 'conaffinity': '1', 'type': 'sphere'}
+
+# distance between neighbouring copies of a multi-instance scene
+MULTI_SPACING = 3.
+# attributes of actuators, equalities, contact pairs/excludes, sensors and
+# tendons that refer to named model elements
+_REF_ATTRS = ('joint', 'jointinparent', 'site', 'body', 'body1', 'body2',
+              'joint1', 'joint2', 'geom1', 'geom2', 'tendon', 'objname', 'target')
+_REF_SECTIONS = ('actuator', 'equality', 'contact', 'sensor', 'tendon')
+# (n_copies, base) -> path of the generated scene, see `multi_scene_path`
+_multi_scene_paths = {}
+
+
+def scene_path(name):
+    try:
+        file_name, build_cmd = SCENES[name]
+    except KeyError:
+        raise ValueError('Unknown scene {!r}, expected one of {}'
+                         .format(name, list(SCENES))) from None
+    path = ASSETS_DIR / file_name
+    if not path.exists():
+        raise FileNotFoundError(
+            'Scene {!r} has not been generated yet, run `{}` from the '
+            'repository root'.format(name, build_cmd))
+    return path.as_posix()
+
+
+def load_flat_scene(path):
+    """Parses an MJCF file and inlines all `<include>` elements recursively"""
+    path = Path(path)
+    root = ET.parse(path).getroot()
+    _inline_includes(root, path.parent)
+    return root
+
+
+def _inline_includes(elem, base_dir):
+    for i, child in enumerate(list(elem)):
+        if child.tag == 'include':
+            included = ET.parse(base_dir / child.get('file')).getroot()
+            _inline_includes(included, base_dir)
+            elem.remove(child)
+            for j, grandchild in enumerate(included):
+                elem.insert(i + j, grandchild)
+        else:
+            _inline_includes(child, base_dir)
+
+
+def scene_files(path):
+    """The scene XML at `path` and every file it references: includes
+    (recursively), meshes, textures, height fields and skins"""
+    path = Path(path)
+    base_dir = path.parent
+    files = [path]
+
+    def visit(file_path):
+        # includes are relative to the main file, as in `load_flat_scene`
+        for include in ET.parse(file_path).getroot().iter('include'):
+            files.append(base_dir / include.get('file'))
+            visit(files[-1])
+
+    visit(path)
+    root = load_flat_scene(path)
+    dirs = {}
+    for compiler in root.iter('compiler'):
+        dirs.update((attr, compiler.get(attr)) for attr in ('meshdir', 'texturedir')
+                    if compiler.get(attr))
+    for elem in root.iter():
+        if elem.tag != 'compiler' and elem.get('file'):
+            asset_dir = dirs.get('texturedir' if elem.tag == 'texture' else 'meshdir', '')
+            files.append(base_dir / asset_dir / elem.get('file'))
+    return files
+
+
+def write_scene(root, path):
+    """Writes a flattened scene, file references are relative to ASSETS_DIR
+    so the output has to live there as well"""
+    ET.indent(root)
+    ET.ElementTree(root).write(path)
+
+
+def geom_defaults(root):
+    """Maps default class name -> resolved geom attributes"""
+    classes = {}
+
+    def visit(default, inherited):
+        name = default.get('class', 'main')
+        attrs = dict(inherited)
+        for geom in default.findall('geom'):
+            attrs.update(geom.attrib)
+        classes[name] = {**classes.get(name, {}), **attrs}
+        for child in default.findall('default'):
+            visit(child, attrs)
+
+    for default in root.findall('default'):
+        visit(default, _GEOM_DEFAULTS)
+    classes.setdefault('main', dict(_GEOM_DEFAULTS))
+    return classes
+
+
+def iter_geoms(root):
+    """Yields (geom element, parent element, resolved attributes) for every
+    geom in the worldbody, in model order (bodies depth first)"""
+    classes = geom_defaults(root)
+
+    def visit(body, childclass):
+        childclass = body.get('childclass', childclass)
+        for geom in body.findall('geom'):
+            attrs = dict(classes[geom.get('class', childclass)])
+            attrs.update(geom.attrib)
+            yield geom, body, attrs
+        for child in body.findall('body'):
+            yield from visit(child, childclass)
+
+    for worldbody in root.findall('worldbody'):
+        yield from visit(worldbody, 'main')
+
+
+def can_collide(attrs):
+    return int(attrs['contype']) != 0 or int(attrs['conaffinity']) != 0
+
+
+def copy_prefix(copy_id):
+    """Name prefix of the elements of one copy in a multi-instance scene"""
+    return 'c{}_'.format(copy_id)
+
+
+def multi_scene_offsets(n_copies, spacing=MULTI_SPACING):
+    """Origins of the copies, on a square grid in the xy plane"""
+    cols = math.ceil(math.sqrt(n_copies))
+    return [(spacing * (k % cols), spacing * (k // cols), 0.) for k in range(n_copies)]
+
+
+def build_multi_scene(n_copies, base='default'):
+    """
+    Tiles `n_copies` copies of the bodies of scene `base` (robot, door and
+    the room's table) into one MJCF. What is attached to the world itself,
+    the lights, the cameras and the floor plane, exists once, around copy 0.
+
+    Bodies, joints, geoms and sites of copy k are prefixed with
+    `copy_prefix(k)` and its top-level bodies are moved by
+    `multi_scene_offsets(...)[k]`. Collision masks of copy k are shifted by
+    (k % n_groups) times the bit width used by the scene, and shared geoms get
+    the masks of all groups, so copies keep colliding with the floor and among
+    themselves as before but never with the copies of other groups.
+
+    Only 31 // width groups fit into the 32-bit masks. Beyond that copies
+    k and k + n_groups share masks and are kept apart by `MULTI_SPACING`
+    alone, which is larger than the reach of the arm.
+    """
+    root = load_flat_scene(scene_path(base))
+    # bodies of the room's worldbody are copied as well, all copies go to the
+    # last worldbody, the scene's own
+    worldbodies = root.findall('worldbody')
+    template = worldbodies[-1]
+    copied_bodies = [body for worldbody in worldbodies for body in worldbody.findall('body')]
+
+    for geom, _, attrs in iter_geoms(root):
+        geom.set('contype', attrs['contype'])
+        geom.set('conaffinity', attrs['conaffinity'])
+    width = max(max(int(geom.get('contype')), int(geom.get('conaffinity')))
+                for geom, _, _ in iter_geoms(root)).bit_length()
+    n_groups = max(1, min(n_copies, 31 // max(width, 1)))
+
+    copied_geoms = {geom for body in copied_bodies for geom in body.iter('geom')}
+    for geom, _, _ in iter_geoms(root):
+        if geom not in copied_geoms:
+            for attr in ('contype', 'conaffinity'):
+                mask = int(geom.get(attr))
+                geom.set(attr, str(sum(mask << (width * g) for g in range(n_groups))))
+
+    copied_names = {elem.get('name') for body in copied_bodies
+                    for elem in body.iter() if elem.get('name')}
+    for worldbody in worldbodies:
+        for body in worldbody.findall('body'):
+            worldbody.remove(body)
+    for k, offset in enumerate(multi_scene_offsets(n_copies)):
+        prefix, shift = copy_prefix(k), width * (k % n_groups)
+        for body in copied_bodies:
+            body = copy.deepcopy(body)
+            for elem in body.iter():
+                if elem.get('name'):
+                    elem.set('name', prefix + elem.get('name'))
+            for geom in body.iter('geom'):
+                for attr in ('contype', 'conaffinity'):
+                    geom.set(attr, str(int(geom.get(attr)) << shift))
+            pos = [float(x) for x in body.get('pos', '0 0 0').split()]
+            body.set('pos', ' '.join(str(x + o) for x, o in zip(pos, offset)))
+            template.append(body)
+
+    for section in root:
+        if section.tag not in _REF_SECTIONS:
+            continue
+        for child in list(section):
+            refs = [attr for attr in _REF_ATTRS if child.get(attr) in copied_names]
+            if not refs:
+                continue
+            section.remove(child)
+            for k in range(n_copies):
+                child_copy = copy.deepcopy(child)
+                for attr in refs + (['name'] if child.get('name') else []):
+                    child_copy.set(attr, copy_prefix(k) + child.get(attr))
+                section.append(child_copy)
+
+    # room for the contacts and constraints of all copies, and a sparse
+    # Jacobian since the copies do not couple
+    size = root.find('size')
+    if size is None:
+        size = ET.Element('size')
+        root.insert(0, size)
+    size.set('njmax', str(500 * n_copies))
+    size.set('nconmax', str(100 * n_copies))
+    for option in root.findall('option'):
+        option.set('jacobian', 'sparse')
+    return root
+
+
+def _absolute_asset_paths(root, base_dir):
+    """Resolves the mesh, texture and compiler directory paths of a flattened
+    scene against `base_dir`, so the scene can be written anywhere"""
+    for elem in root.iter():
+        if elem.tag == 'compiler':
+            for attr in ('meshdir', 'texturedir'):
+                if elem.get(attr):
+                    elem.set(attr, (base_dir / elem.get(attr)).resolve().as_posix())
+        elif elem.get('file'):
+            elem.set('file', (base_dir / elem.get('file')).resolve().as_posix())
+
+
+def multi_scene_path(n_copies, base='default'):
+    """Path of the multi-instance scene, generated into the model cache
+    directory unless it is there already.
+
+    The file name carries a digest of the arguments and of the files the
+    scene is generated from (`scene_files` of `base` and this module), so
+    the file is reused across processes until one of them changes. It is
+    written to a temporary file and renamed into place, so processes
+    generating the same scene concurrently never read a partial file.
+    """
+    key = n_copies, base
+    path = _multi_scene_paths.get(key)
+    if path is not None:
+        return path
+    source = scene_path(base)
+    digest = stat_digest(scene_files(source) + [__file__], n_copies, base, MULTI_SPACING)
+    path = Path(CACHE_DIR) / 'scenes' / '{}_x{}_{}.xml'.format(
+        Path(source).stem, n_copies, digest[:16])
+    if not path.exists():
+        root = build_multi_scene(n_copies, base=base)
+        _absolute_asset_paths(root, ASSETS_DIR)
+        ET.indent(root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, ET.tostring(root))
+    path = _multi_scene_paths[key] = path.as_posix()
+    return path
@@ -34,6 +34,18 @@ OBS_SPECS = {
 }
 
 
+# layout of the info record written by the env in the 'record' info mode
+INFO_DTYPE = np.dtype([
+    ('success', np.float64),
+    ('near_object', np.float64),
+    ('grasp_success', np.bool_),
+    ('grasp_reward', np.float64),
+    ('in_place_reward', np.float64),
+    ('obj_to_target', np.float64),
+    ('unscaled_reward', np.float64),
+])
+
+
 class VecQuantSpec:
     def __init__(self, quants_to_sizes: Dict[Enum, int]):
         self._quants_to_sizes = quants_to_sizes
@@ -73,6 +85,83 @@ class VecQuantSpec:
         repeats = [self._quants_to_sizes[q] for q in self]
         return np.repeat(max_vals, repeats)
 
+    def make_running_normalizer(self, eps: float = 1e-8):
+        """Streaming mean/variance normalizer over the quantities of this
+        spec, `Q.unused` excluded"""
+        return RunningNormalizer(self, eps=eps)
+
+
+class RunningNormalizer:
+    """Running per-element mean and variance (Welford) of the spec's quantities.
+
+    `update()` takes (B, obs_dim) batches. Statistics from several workers
+    combine exactly with `merge()` (Chan et al. parallel update), and
+    `to_bytes()` / `from_bytes()` serialize them as float64 count, mean and
+    sum of squared deviations of the tracked elements. `Q.unused` elements are
+    neither tracked nor changed by `normalize()`.
+    """
+    def __init__(self, spec: VecQuantSpec, eps: float = 1e-8):
+        self.spec = spec
+        self.eps = eps
+        self.quants = [q for q in spec if q != Q.unused]
+        self._idx = np.concatenate(
+            [np.arange(len(spec))[spec[q]] for q in self.quants]).astype(np.int64)
+        # slices of the quantities in the tracked statistics
+        self._stat_idx = VecQuantSpec({q: spec._quants_to_sizes[q] for q in self.quants})
+        self.count = 0.
+        self.mean = np.zeros(len(self._idx))
+        self.m2 = np.zeros(len(self._idx))
+
+    def update(self, batch: np.ndarray):
+        x = np.asarray(batch, dtype=np.float64).reshape(-1, len(self.spec))[:, self._idx]
+        if len(x) == 0:
+            return
+        mean = x.mean(axis=0)
+        self._combine(len(x), mean, np.square(x - mean).sum(axis=0))
+
+    def merge(self, other: 'RunningNormalizer'):
+        assert np.array_equal(self._idx, other._idx)
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + np.square(delta) * (self.count * count / total)
+        self.count = total
+
+    @property
+    def var(self) -> np.ndarray:
+        return self.m2 / max(self.count, 1.)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var + self.eps)
+
+    def stats(self, q: Enum):
+        """Mean and variance of quantity `q`"""
+        return self.mean[self._stat_idx[q]], self.var[self._stat_idx[q]]
+
+    def normalize(self, obs: np.ndarray) -> np.ndarray:
+        out = np.array(obs, dtype=np.result_type(obs, np.float32))
+        out[..., self._idx] = (out[..., self._idx] - self.mean) / self.std
+        return out
+
+    def to_bytes(self) -> bytes:
+        return np.concatenate([[self.count], self.mean, self.m2]).astype('<f8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, spec: VecQuantSpec, data: bytes, eps: float = 1e-8):
+        normalizer = cls(spec, eps=eps)
+        values = np.frombuffer(data, dtype='<f8')
+        n = len(normalizer._idx)
+        assert len(values) == 1 + 2 * n, 'Statistics do not match the spec'
+        normalizer.count = float(values[0])
+        normalizer.mean = values[1:1 + n].copy()
+        normalizer.m2 = values[1 + n:].copy()
+        return normalizer
+
 
 class EnvSpec:
     def __init__(self,
@@ -0,0 +1,129 @@
+"""
+Start states written directly into the sim state.
+
+Instead of stepping the simulator until the mocap weld has pulled the hand to
+a pose (`SawyerXYZEnv._reset_hand`), the arm joints are solved for the hand
+pose by damped least-squares inverse kinematics on the kinematics alone. The
+door angle and the gripper opening are set in `qpos`, and a single
+`forward()` makes the rest of the state consistent.
+"""
+import warnings
+
+import mujoco_py
+import numpy as np
+
+
+ARM_JOINTS = tuple('right_j{}'.format(i) for i in range(7))
+GRIPPER_JOINTS = ('r_close', 'l_close')
+# orientation the mocap weld holds the hand at, mocap quat (1, 0, 1, 0)
+HAND_MAT = np.array([[0., 0., 1.],
+                     [0., 1., 0.],
+                     [-1., 0., 0.]])
+
+
+def solve_hand_ik(sim, hand_bodies, arm_joints, targets, iterations=100,
+                  tol=1e-4, damping=1e-2):
+    """Moves the arm joints so that the hands reach `targets`.
+
+    All hands are solved together, every iteration updates the kinematics of
+    the whole sim once. Only `qpos` is written, run `sim.forward()` after.
+
+    Args:
+        hand_bodies: (N,) body ids of the hands
+        arm_joints: (N, j) joint ids of the arm of each hand
+        targets: (N, 3) hand positions, the orientation is `HAND_MAT`
+
+    Returns:
+        np.ndarray: (N,) position errors after the last update
+    """
+    m, d = sim.model, sim.data
+    hand_bodies = np.asarray(hand_bodies)
+    arm_joints = np.asarray(arm_joints)
+    n, j = arm_joints.shape
+    qpos_idx = m.jnt_qposadr[arm_joints]
+    dof_idx = m.jnt_dofadr[arm_joints]
+    limited = m.jnt_limited[arm_joints].astype(bool)
+    low = np.where(limited, m.jnt_range[arm_joints, 0], -np.inf)
+    high = np.where(limited, m.jnt_range[arm_joints, 1], np.inf)
+
+    jacp, jacr = np.zeros(3 * m.nv), np.zeros(3 * m.nv)
+    jac = np.zeros((n, 6, j))
+    regularizer = damping ** 2 * np.eye(6)
+
+    def errors():
+        mujoco_py.functions.mj_kinematics(m, d)
+        mujoco_py.functions.mj_comPos(m, d)
+        pos_err = targets - d.body_xpos[hand_bodies]
+        mat = d.body_xmat[hand_bodies].reshape(n, 3, 3)
+        # 0.5 * sum of the cross products of current and target axes (columns)
+        rot_err = 0.5 * np.cross(mat, HAND_MAT[None], axis=1).sum(axis=2)
+        return np.concatenate([pos_err, rot_err], axis=1)
+
+    err = errors()
+    for _ in range(iterations):
+        if np.abs(err).max() < tol:
+            break
+        for k in range(n):
+            mujoco_py.functions.mj_jacBody(m, d, jacp, jacr, hand_bodies[k])
+            jac[k, :3] = jacp.reshape(3, m.nv)[:, dof_idx[k]]
+            jac[k, 3:] = jacr.reshape(3, m.nv)[:, dof_idx[k]]
+        jac_t = jac.transpose(0, 2, 1)
+        step = jac_t @ np.linalg.solve(jac @ jac_t + regularizer, err[..., None])
+        d.qpos[qpos_idx] = np.clip(d.qpos[qpos_idx] + step[..., 0], low, high)
+        err = errors()
+    return np.linalg.norm(err[:, :3], axis=1)
+
+
+def _quat2mat(quat):
+    """Rotation matrices (N, 3, 3) of the (not necessarily unit) quaternions
+    (N, 4) in MuJoCo's (w, x, y, z) order"""
+    w, x, y, z = (quat / np.linalg.norm(quat, axis=1, keepdims=True)).T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+
+
+def check_hand_orientation(sim, hand_bodies, hand_mocaps, atol=1e-2):
+    """Warns if a solved hand is not at the orientation its mocap weld holds
+    it at, the first step would then snap the wrist back
+
+    Returns:
+        np.ndarray: (N,) largest absolute difference of the rotation matrices
+    """
+    d = sim.data
+    hand_bodies = np.asarray(hand_bodies)
+    mat = d.body_xmat[hand_bodies].reshape(-1, 3, 3)
+    mocap_mat = _quat2mat(d.mocap_quat[np.asarray(hand_mocaps)])
+    diff = np.abs(mat - mocap_mat).max(axis=(1, 2))
+    if np.any(diff > atol):
+        warnings.warn('Hand orientation differs from the mocap weld by up to {:.3g} '
+                      'after IK'.format(diff.max()), category=RuntimeWarning)
+    return diff
+
+
+def set_gripper(sim, gripper_joints, gripper_ctrl, grip):
+    """Sets the finger joints (N, 2) to where the position actuators settle
+    for the gripper action `grip` (N,), -1 open to 1 closed, and holds them
+    there with the controls (N, 2)"""
+    m, d = sim.model, sim.data
+    gripper_joints = np.asarray(gripper_joints)
+    grip = np.asarray(grip, dtype=np.float64)
+    target = np.stack([grip, -grip], axis=-1)
+    d.qpos[m.jnt_qposadr[gripper_joints]] = np.clip(
+        target, m.jnt_range[gripper_joints, 0], m.jnt_range[gripper_joints, 1])
+    d.ctrl[np.asarray(gripper_ctrl)] = target
+
+
+def sample_start_states(rng, n, hand_low, hand_high, door_angle_range=(-np.pi / 2, 0.),
+                        grip_range=(-1., 1.)):
+    """Uniform start states for `set_start_state(s)`
+
+    Returns:
+        (n, 3) hand positions, (n,) door angles, (n,) gripper actions
+    """
+    hand_pos = rng.uniform(hand_low, hand_high, size=(n, 3))
+    door_angle = rng.uniform(*door_angle_range, size=n)
+    grip = rng.uniform(*grip_range, size=n)
+    return hand_pos, door_angle, grip
@@ -0,0 +1,62 @@
+import numpy as np
+from gym.utils import seeding
+
+from .sawyer_xyz.sawyer_door_v2 import SawyerDoorEnvV2
+
+
+class TaskPool:
+    """
+    Table of task parameters (door positions, the env's `_last_rand_vec`).
+
+    Rows are sampled without building a simulator and can be applied to a
+    live env with `SawyerXYZEnv.set_rand_vec`, which avoids reloading the model.
+    """
+    def __init__(self, rand_vecs, seeds=None):
+        self.rand_vecs = np.asarray(rand_vecs, dtype=np.float64)
+        assert self.rand_vecs.ndim == 2
+        self.seeds = None if seeds is None else np.asarray(seeds)
+
+    @classmethod
+    def from_seeds(cls, seeds, env_cls=SawyerDoorEnvV2):
+        """Samples one row per seed.
+
+        A row equals the door position of
+        `ALL_V2_ENVIRONMENTS_GOAL_OBSERVABLE[...](seed)`, which draws it first
+        thing from the env's freshly seeded `np_random`.
+        """
+        low, high = np.array(env_cls.OBJ_LOW), np.array(env_cls.OBJ_HIGH)
+        rand_vecs = [seeding.np_random(seed)[0].uniform(low, high, size=low.size)
+                     for seed in seeds]
+        return cls(rand_vecs, seeds=list(seeds))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['rand_vecs'],
+                   seeds=data['seeds'] if 'seeds' in data else None)
+
+    def save(self, path):
+        arrays = {'rand_vecs': self.rand_vecs}
+        if self.seeds is not None:
+            arrays['seeds'] = self.seeds
+        np.savez(path, **arrays)
+
+    def __len__(self):
+        return len(self.rand_vecs)
+
+    def __getitem__(self, task_id):
+        return self.rand_vecs[task_id]
+
+    def shard(self, worker_id, n_workers):
+        """Disjoint subset of the table for one of `n_workers` workers"""
+        return TaskPool(self.rand_vecs[worker_id::n_workers],
+                        seeds=None if self.seeds is None
+                        else self.seeds[worker_id::n_workers])
+
+    def sample(self, np_random):
+        """Draws a task id"""
+        return int(np_random.randint(len(self)))
+
+    def apply(self, env, task_id):
+        """Switches `env` to task `task_id`, effective on its next reset"""
+        env.unwrapped.set_rand_vec(self.rand_vecs[task_id])
@@ -1,6 +1,5 @@
 import numpy as np
 
-from .mujoco_utils import add_subtree_as_marker
 from .spec import Q
 from .sawyer_xyz.sawyer_door_v2 import SawyerDoorEnvV2
 from .sawyer_xyz import reward_utils
@@ -58,10 +57,17 @@ class DoorOpenRewardFunctor:
 
 
 def render_state(state_spec, x, env, is_offscreen=True):
-    if is_offscreen and env.sim._render_context_offscreen is None:
-        env.render(offscreen=True)
-    if not is_offscreen and env.viewer is None:
-        env.render(offscreen=False)
+    # scipy and the marker helpers are only needed for rendering
+    from .mujoco_utils import add_subtree_as_marker
+    from .rendering import get_shared_renderer
+
+    # offscreen markers go to the shared context, whose sim mirrors env.sim
+    if is_offscreen:
+        marker_sim = get_shared_renderer().sync(env)
+    else:
+        if env.viewer is None:
+            env.render(offscreen=False)
+        marker_sim = env.sim
 
     # eef
     def add_gt_eef():
@@ -75,7 +81,7 @@ def render_state(state_spec, x, env, is_offscreen=True):
                 "l_close": 0}
         qpos = {
             k: env.data.qpos[env.model.jnt_qposadr[env.model.joint_name2id(k)]] for k in qpos}
-        add_subtree_as_marker(env.sim,
+        add_subtree_as_marker(marker_sim,
                               None if is_offscreen else env.viewer,
                               pos=body_pos,
                               quat=body_quat,
@@ -89,7 +95,7 @@ def render_state(state_spec, x, env, is_offscreen=True):
     qpos = {"r_close": 0,
             "l_close": 0}
     #eef_pos[0] += 0.30
-    add_subtree_as_marker(env.sim,
+    add_subtree_as_marker(marker_sim,
                           None if is_offscreen else env.viewer,
                           pos=np.asarray(eef_pos),
                           quat=np.asarray(eef_quat),
@@ -113,7 +119,7 @@ def render_state(state_spec, x, env, is_offscreen=True):
 
         handle_pos[0] += 0.3
 
-        add_subtree_as_marker(env.sim,
+        add_subtree_as_marker(marker_sim,
                               None if is_offscreen else env.viewer,
                               pos=handle_pos,
                               quat=handle_quat,
@@ -127,7 +133,7 @@ def render_state(state_spec, x, env, is_offscreen=True):
     handle_quat = x[state_spec[Q.handle_quat]][[3, 0, 1, 2]]
     handle_pos = x[state_spec[Q.handle_pos]]
     # handle_pos[0] += 0.3
-    add_subtree_as_marker(env.sim,
+    add_subtree_as_marker(marker_sim,
                           None if is_offscreen else env.viewer,
                           pos=np.asarray(handle_pos),
                           quat=np.asarray(handle_quat),
@@ -139,6 +145,6 @@ def render_state(state_spec, x, env, is_offscreen=True):
     # render
     image = env.render(offscreen=is_offscreen)
     if is_offscreen:
-        env.sim._render_context_offscreen._markers[:] = []
+        get_shared_renderer().clear_markers()
 
     return image
@@ -0,0 +1,247 @@
+"""
+Subprocess vector env.
+
+Workers are spawned with a small `EnvDescriptor` instead of a pickled env and
+build their env locally, loading the compiled model from `model_cache`.
+"""
+import multiprocessing as mp
+from multiprocessing.connection import wait
+import time
+
+import numpy as np
+
+from .spec import INFO_DTYPE
+
+
+class EnvDescriptor:
+    """Everything a worker needs to build its env, cheap to pickle"""
+    def __init__(self, seed, max_episode_length, rand_vec=None,
+                 sim_profile='default', use_gripper=True, scene='default',
+                 double_buffer=False, dtype=np.float64, info_mode='dict',
+                 render_backend=None, success_grace=None, task_pool=None,
+                 task_shard=None):
+        self.seed = seed
+        self.max_episode_length = max_episode_length
+        self.rand_vec = None if rand_vec is None else np.asarray(rand_vec)
+        self.sim_profile = sim_profile
+        self.use_gripper = use_gripper
+        self.scene = scene
+        # prepare the next episode in the background, see `DoubleBufferedEnv`
+        self.double_buffer = double_buffer
+        self.dtype = np.dtype(dtype)
+        self.info_mode = info_mode
+        # offscreen backend of the worker, see `rendering.select_backend`
+        self.render_backend = render_backend
+        # end episodes early after success, see `EpisodeLengthWrapper`
+        self.success_grace = success_grace
+        # draw a task from `task_pool` on every reset, `task_shard`
+        # (worker_id, n_workers) keeps only this worker's part of the table
+        if task_pool is not None and task_shard is not None:
+            task_pool = task_pool.shard(*task_shard)
+        self.task_pool = task_pool
+
+    def build(self):
+        if self.render_backend is not None:
+            from .rendering import select_backend
+            select_backend(self.render_backend)
+        if self.double_buffer:
+            from .pipelining import DoubleBufferedEnv
+            # both envs draw tasks on their own resets, seed them apart so
+            # they do not run the same task sequence
+            task_seeds = iter([None, None if self.seed is None
+                               else self.seed + 2 ** 32])
+            return DoubleBufferedEnv(lambda: self._build_single(next(task_seeds)))
+        return self._build_single()
+
+    def _build_single(self, task_seed=None):
+        from .factory import make_env
+        return make_env(self.max_episode_length, self.seed,
+                        use_gripper=self.use_gripper,
+                        sim_profile=self.sim_profile,
+                        rand_vec=self.rand_vec,
+                        scene=self.scene,
+                        dtype=self.dtype,
+                        info_mode=self.info_mode,
+                        success_grace=self.success_grace,
+                        task_pool=self.task_pool,
+                        task_seed=task_seed)
+
+
+def _worker(remote, parent_remote, descriptor):
+    parent_remote.close()
+    start = time.perf_counter()
+    env = descriptor.build()
+    remote.send((time.perf_counter() - start,
+                 env.observation_space, env.action_space))
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                obs, reward, done, info = env.step(data)
+                terminal_obs = None
+                if done:
+                    if isinstance(info, dict):
+                        info['terminal_observation'] = obs
+                    else:
+                        terminal_obs = obs
+                    obs = env.reset()
+                remote.send((obs, reward, done, info, terminal_obs))
+            elif cmd == 'reset':
+                remote.send(env.reset())
+            elif cmd == 'call':
+                name, args, kwargs = data
+                remote.send(getattr(env, name)(*args, **kwargs))
+            elif cmd == 'close':
+                break
+            else:
+                raise ValueError('Unknown command {!r}'.format(cmd))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+
+class SubprocVecEnv:
+    """
+    Steps one env per worker process, finished envs are reset automatically
+    (the last observation of the episode is in `info['terminal_observation']`).
+
+    After construction, `startup_times[i]` is the wall time from starting
+    worker `i` to its env being ready and `build_times[i]` the part of it
+    spent building the env inside the worker.
+
+    With descriptors in the 'record' info mode, `step()` returns the infos as
+    per-field arrays: the structured array `infos` of `INFO_DTYPE`, overwritten
+    on every step. Terminal observations then go to `terminal_observations`
+    (valid for the envs that are done).
+
+    `send()` / `recv()` step envs asynchronously: `recv()` returns as soon as
+    `min_batch` of the envs sent actions are done stepping, together with
+    their ids, so slow envs do not hold up the others. Sync calls (`step()`,
+    `reset()`, `env_method()`) need all results to be received first.
+    """
+    def __init__(self, descriptors, start_method='spawn'):
+        ctx = mp.get_context(start_method)
+        self.num_envs = len(descriptors)
+        self.info_mode = descriptors[0].info_mode
+        assert all(d.info_mode == self.info_mode for d in descriptors)
+        self.remotes, self.processes = [], []
+        started = []
+        for descriptor in descriptors:
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(target=_worker,
+                                  args=(worker_remote, remote, descriptor),
+                                  daemon=True)
+            started.append(time.perf_counter())
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.startup_times = np.empty(self.num_envs)
+        self.build_times = np.empty(self.num_envs)
+        # take each worker's time when it reports, not in index order
+        index = {remote: i for i, remote in enumerate(self.remotes)}
+        while index:
+            for remote in wait(list(index)):
+                ready = time.perf_counter()
+                i = index.pop(remote)
+                build_time, self.observation_space, self.action_space = remote.recv()
+                self.startup_times[i] = ready - started[i]
+                self.build_times[i] = build_time
+        if self.info_mode == 'record':
+            self.infos = np.zeros(self.num_envs, dtype=INFO_DTYPE)
+            self.terminal_observations = np.zeros(
+                (self.num_envs,) + self.observation_space.shape,
+                dtype=self.observation_space.dtype)
+        self._waiting = np.zeros(self.num_envs, dtype=bool)
+        self.closed = False
+
+    def reset(self):
+        self._assert_not_waiting()
+        for remote in self.remotes:
+            remote.send(('reset', None))
+        return np.stack([remote.recv() for remote in self.remotes])
+
+    def step(self, actions):
+        self._assert_not_waiting()
+        for remote, action in zip(self.remotes, actions):
+            remote.send(('step', action))
+        results = [remote.recv() for remote in self.remotes]
+        obs, rewards, dones, infos = self._collect(range(self.num_envs), results)
+        if self.info_mode == 'record':
+            self.infos[:] = infos
+            infos = self.infos
+        return obs, rewards, dones, infos
+
+    def send(self, actions, env_ids=None):
+        """Starts stepping the envs `env_ids` (all if None) with `actions`,
+        one row per id. The envs must not have results pending."""
+        env_ids = np.arange(self.num_envs) if env_ids is None else np.asarray(env_ids)
+        assert len(actions) == len(env_ids)
+        assert not self._waiting[env_ids].any(), 'Results of these envs are pending'
+        for i, action in zip(env_ids, actions):
+            self.remotes[i].send(('step', action))
+        self._waiting[env_ids] = True
+
+    def recv(self, min_batch=1, timeout=None):
+        """Waits until at least `min_batch` of the pending envs are done
+        stepping (or `timeout` seconds passed) and returns all finished ones.
+
+        Returns:
+            env ids, observations, rewards, dones and infos of the finished
+            envs ('record' infos as a new structured array)
+        """
+        pending = {self.remotes[i]: i for i in np.flatnonzero(self._waiting)}
+        min_batch = min(min_batch, len(pending))
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        ready = wait(list(pending), 0.)
+        while len(ready) < min_batch:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            ready += wait([r for r in pending if r not in ready], remaining)
+        env_ids = np.array(sorted(pending[r] for r in ready), dtype=np.int64)
+        results = [self.remotes[i].recv() for i in env_ids]
+        self._waiting[env_ids] = False
+        return (env_ids, *self._collect(env_ids, results))
+
+    def _collect(self, env_ids, results):
+        obs, rewards, dones, infos, terminal_obs = zip(*results) if results else ((),) * 5
+        if self.info_mode == 'record':
+            records = np.zeros(len(infos), dtype=INFO_DTYPE)
+            for j, info in enumerate(infos):
+                records[j] = info
+            infos = records
+            for i, terminal in zip(env_ids, terminal_obs):
+                if terminal is not None:
+                    self.terminal_observations[i] = terminal
+        else:
+            infos = list(infos)
+        space = self.observation_space
+        obs = np.stack(obs) if obs else np.empty((0,) + space.shape, dtype=space.dtype)
+        return (obs,
+                np.array(rewards, dtype=space.dtype),
+                np.array(dones, dtype=bool), infos)
+
+    def _assert_not_waiting(self):
+        assert not self._waiting.any(), 'Receive the pending results first'
+
+    def env_method(self, name, *args, **kwargs):
+        """Calls `name` on every env and returns the results"""
+        self._assert_not_waiting()
+        for remote in self.remotes:
+            remote.send(('call', (name, args, kwargs)))
+        return [remote.recv() for remote in self.remotes]
+
+    def close(self):
+        if self.closed:
+            return
+        for i in np.flatnonzero(self._waiting):
+            self.remotes[i].recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
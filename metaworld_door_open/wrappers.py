@@ -1,43 +1,66 @@
-import numpy as np
 import gym
-import gym.spaces
+import numpy as np
+from gym.utils import seeding
 
 
 class DoorOpenNoGripperObs(gym.ObservationWrapper):
+    """
+    Compatibility shim: the gripper observation is dropped natively by the env,
+    configure it with `configure_gripper(observe=False)` before wrapping.
+    """
     def __init__(self, env):
+        if env.unwrapped._observe_gripper:
+            raise ValueError('Call env.unwrapped.configure_gripper(observe=False) '
+                             'before wrapping with DoorOpenNoGripperObs')
         super().__init__(env)
-        low = env.observation_space.low
-        high = env.observation_space.high
-        self.observation_space = gym.spaces.Box(
-            np.concatenate((low[:3], low[4:])),
-            np.concatenate((high[:3], high[4:])),
-        )
-        
+
     def observation(self, obs):
-        return np.concatenate((obs[:3], obs[4:]))
-    
-    
+        return obs
+
+    def step_n(self, *args, **kwargs):
+        return self.env.step_n(*args, **kwargs)
+
+
 class DoorOpenNoGripperControl(gym.ActionWrapper):
+    """
+    Compatibility shim: the gripper control is fixed natively by the env,
+    configure it with `configure_gripper(control=False)` before wrapping.
+    """
     def __init__(self, env):
+        if env.unwrapped._control_gripper:
+            raise ValueError('Call env.unwrapped.configure_gripper(control=False) '
+                             'before wrapping with DoorOpenNoGripperControl')
         super().__init__(env)
-        low = env.action_space.low
-        high = env.action_space.high
-        self.action_space = gym.spaces.Box(
-            low[:3], high[:3])
-        
+
     def action(self, action):
-        return action[:3]
+        return action
+
+    def step_n(self, *args, **kwargs):
+        return self.env.step_n(*args, **kwargs)
 
 
 class EpisodeLengthWrapper(gym.Wrapper):
-    def __init__(self, env, max_length=6000):
+    """
+    Ends episodes after `max_length` steps or, if `success_grace` is given,
+    `success_grace` steps after the first successful one.
+
+    Steps cut off by an early end are reported in `steps_saved` (and in
+    `info['steps_saved']` for dict infos) at the end of the episode, and
+    summed up in `total_steps_saved`.
+    """
+    def __init__(self, env, max_length=6000, success_grace=None):
         self.cnt = 0
         self.max_length = max_length
+        self.success_grace = success_grace
+        self.first_success = None
+        self.steps_saved = 0
+        self.total_steps_saved = 0
         super().__init__(env)
 
     def reset(self, **kwargs):
         observation = self.env.reset(**kwargs)
         self.cnt = 0
+        self.first_success = None
         return observation
 
     def step(self, action):
@@ -46,11 +69,157 @@ class EpisodeLengthWrapper(gym.Wrapper):
         # print(f'Counter is: {self.cnt}')
 
         observation, reward, done, info = self.env.step(action)
-        return observation, reward, self.done(done), info
+        if self.success_grace is not None and self.first_success is None \
+                and info['success']:
+            self.first_success = self.cnt
+        done = self.done(done)
+        if done:
+            self._end_episode(info)
+        return observation, reward, done, info
+
+    def step_n(self, actions, returns='last', obs_out=None, reward_out=None):
+        """`SawyerXYZEnv.step_n` limited to the steps left in the episode.
+
+        Stops early when the episode ends, `returns` and the buffers are used
+        as there.
+
+        Returns:
+            observation(s), reward(s), done, info of the last step run, number
+            of steps run
+        """
+        assert not self.done(False), 'The episode is over, call reset()'
+        k = min(len(actions), self.max_length - self.cnt)
+        if returns == 'all':
+            space = self.observation_space
+            if obs_out is None:
+                obs_out = np.empty((k,) + space.shape, dtype=space.dtype)
+            if reward_out is None:
+                reward_out = np.empty(k, dtype=space.dtype)
+
+        n = 0
+        reward_sum = 0.
+        while True:
+            # the success grace window needs success checked on every step
+            watch = self.success_grace is not None and self.first_success is None
+            end = k
+            if self.first_success is not None:
+                end = min(k, n + self.first_success + self.success_grace - self.cnt)
+            observation, reward, _, info, m = self.env.step_n(
+                actions[n:end], returns,
+                obs_out=None if obs_out is None else obs_out[n:end],
+                reward_out=None if reward_out is None else reward_out[n:end],
+                until_success=watch)
+            n += m
+            self.cnt += m
+            reward_sum += reward if returns == 'sum' else 0.
+            if watch and info['success']:
+                self.first_success = self.cnt
+            done = self.done(False)
+            if done or n >= k:
+                break
+
+        if done:
+            self._end_episode(info)
+        if returns == 'all':
+            return obs_out[:n], reward_out[:n], done, info, n
+        if returns == 'sum':
+            reward = self.observation_space.dtype.type(reward_sum)
+        return observation, reward, done, info, n
+
+    def _end_episode(self, info):
+        self.steps_saved = max(self.max_length - self.cnt, 0)
+        self.total_steps_saved += self.steps_saved
+        if isinstance(info, dict):
+            info['steps_saved'] = self.steps_saved
 
     def done(self, done):
         if done:
             return True
         if self.cnt >= self.max_length:
             return True
+        if self.first_success is not None and \
+                self.cnt >= self.first_success + self.success_grace:
+            return True
         return False
+
+
+class TaskPoolWrapper(gym.Wrapper):
+    """Switches the env to a task drawn from `task_pool` on every reset"""
+    def __init__(self, env, task_pool, seed=None):
+        super().__init__(env)
+        self.task_pool = task_pool
+        self.task_id = None
+        self.np_random, _ = seeding.np_random(seed)
+
+    def reset(self, **kwargs):
+        self.task_id = self.task_pool.sample(self.np_random)
+        self.task_pool.apply(self.env, self.task_id)
+        return self.env.reset(**kwargs)
+
+
+class PixelObservationWrapper(gym.ObservationWrapper):
+    """
+    Replaces the state observation with the last `num_frames` offscreen
+    renders of `camera_name`, rendered directly at `resolution` (width,
+    height) and optionally converted to grayscale.
+
+    Frames are kept in a uint8 ring buffer that holds every frame twice, at
+    slot i and i + num_frames, so the stack (oldest first) is always the
+    contiguous view `buffer[i:i + num_frames]` and stepping moves `i` instead of
+    shifting frames. The returned view is overwritten by later steps, copy it
+    to keep it.
+    """
+    # ITU-R 601 luma weights in 1/256 units
+    _GRAY_WEIGHTS = (77, 150, 29)
+
+    def __init__(self, env, resolution=(84, 84), grayscale=False, num_frames=4,
+                 camera_name='corner2'):
+        super().__init__(env)
+        self.resolution = tuple(resolution)
+        self.grayscale = grayscale
+        self.num_frames = num_frames
+        self.camera_name = camera_name
+
+        width, height = self.resolution
+        frame_shape = (height, width) if grayscale else (height, width, 3)
+        self._frames = np.zeros((2 * num_frames,) + frame_shape, dtype=np.uint8)
+        self._gray_scratch = np.zeros((2, height, width), dtype=np.uint16)
+        self._oldest = 0
+        self.observation_space = gym.spaces.Box(
+            0, 255, (num_frames,) + frame_shape, dtype=np.uint8)
+
+    def reset(self, **kwargs):
+        self.env.reset(**kwargs)
+        self._write_frame(0)
+        self._frames[1:] = self._frames[0]
+        self._oldest = 0
+        return self._frames[:self.num_frames]
+
+    def step_n(self, *args, **kwargs):
+        # the frame stack needs a render after every step
+        raise TypeError('PixelObservationWrapper renders every step, '
+                        'use step() instead of step_n()')
+
+    def observation(self, observation):
+        slot = self._oldest
+        self._write_frame(slot)
+        self._frames[slot + self.num_frames] = self._frames[slot]
+        self._oldest = (slot + 1) % self.num_frames
+        return self._frames[self._oldest:self._oldest + self.num_frames]
+
+    def _write_frame(self, slot):
+        image = self.env.unwrapped.render(offscreen=True, resolution=self.resolution,
+                                          camera_name=self.camera_name)
+        # offscreen buffers are read bottom row first
+        image = image[::-1]
+        if not self.grayscale:
+            self._frames[slot] = image
+            return
+        gray, weighted = self._gray_scratch
+        np.multiply(image[..., 0], self._GRAY_WEIGHTS[0], out=gray, dtype=np.uint16)
+        for channel in (1, 2):
+            np.multiply(image[..., channel], self._GRAY_WEIGHTS[channel],
+                        out=weighted, dtype=np.uint16)
+            gray += weighted
+        np.right_shift(gray, 8, out=gray)
+        self._frames[slot] = gray
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('mujoco_py')
+
+from metaworld_door_open.vector import EnvDescriptor, SubprocVecEnv
+
+
+N_ENVS = 3
+N_STEPS = 12
+
+
+@pytest.fixture
+def vec_envs():
+    envs = [SubprocVecEnv([EnvDescriptor(seed, max_episode_length=5)
+                           for seed in range(N_ENVS)]) for _ in range(2)]
+    yield envs
+    for env in envs:
+        env.close()
+
+
+def test_send_recv_matches_step(vec_envs):
+    sync, async_ = vec_envs
+    rng = np.random.RandomState(0)
+    np.testing.assert_array_equal(sync.reset(), async_.reset())
+    for _ in range(N_STEPS):
+        actions = rng.uniform(-1., 1., size=(N_ENVS, 4))
+        obs, rewards, dones, _ = sync.step(actions)
+
+        async_.send(actions)
+        got = {}
+        while len(got) < N_ENVS:
+            env_ids, *results = async_.recv(min_batch=1)
+            assert len(env_ids) >= 1
+            for j, i in enumerate(env_ids):
+                assert i not in got
+                got[i] = [r[j] for r in results]
+        for i in range(N_ENVS):
+            np.testing.assert_array_equal(got[i][0], obs[i])
+            assert got[i][1] == rewards[i]
+            assert got[i][2] == dones[i]
+
+
+def test_recv_returns_only_sent_envs(vec_envs):
+    env = vec_envs[0]
+    env.reset()
+    env.send(np.zeros((2, 4)), env_ids=[2, 0])
+    received = []
+    while len(received) < 2:
+        env_ids, obs, rewards, dones, infos = env.recv()
+        assert len(env_ids) == len(obs) == len(rewards) == len(dones) == len(infos)
+        received.extend(env_ids)
+    assert sorted(received) == [0, 2]
+    assert not env._waiting.any()
+    with pytest.raises(AssertionError):
+        env.send(np.zeros((1, 4)), env_ids=[1])
+        env.send(np.zeros((1, 4)), env_ids=[1])
@@ -0,0 +1,33 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+rotation = pytest.importorskip('scipy.spatial.transform').Rotation
+
+from tools.build_collision_meshes import compiler_settings, geom_quat
+
+
+@pytest.mark.parametrize('eulerseq', ['xyz', 'zyx', 'XYZ', 'ZXZ'])
+def test_euler_matches_scipy(eulerseq):
+    angles = [0.3, -1.2, 2.0]
+    geom = ET.Element('geom', {'euler': ' '.join(map(str, angles))})
+    quat = geom_quat(geom, {'angle': 'radian', 'eulerseq': eulerseq})
+    # scipy uses uppercase for moving axes, MuJoCo lowercase
+    x, y, z, w = rotation.from_euler(eulerseq.swapcase(), angles).as_quat()
+    assert np.allclose(quat, [w, x, y, z]) or np.allclose(quat, [-w, -x, -y, -z])
+
+
+def test_axisangle_in_degrees_and_compiler_defaults():
+    root = ET.fromstring('<mujoco><compiler eulerseq="zyx"/></mujoco>')
+    compiler = compiler_settings(root)
+    assert compiler == {'angle': 'degree', 'eulerseq': 'zyx'}
+    geom = ET.Element('geom', {'axisangle': '0 0 2 90'})
+    np.testing.assert_allclose(geom_quat(geom, compiler),
+                               [np.sqrt(0.5), 0., 0., np.sqrt(0.5)])
+
+
+def test_unsupported_orientation_names_the_geom():
+    geom = ET.Element('geom', {'mesh': 'base', 'zaxis': '0 1 0'})
+    with pytest.raises(ValueError, match='base'):
+        geom_quat(geom, {'angle': 'radian', 'eulerseq': 'xyz'})
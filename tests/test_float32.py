@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('mujoco_py')
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+
+N_STEPS = 150
+REWARD_RTOL = 1e-6
+
+
+def rollout(dtype, seed, use_gripper, actions=None):
+    """Rewards, success flags, observations and actions of one episode of the
+    scripted policy, or of `actions` if given"""
+    env = make_dooropen_env(N_STEPS, seed, use_gripper=use_gripper, dtype=dtype)
+    policy = SawyerDoorOpenV2Policy(dtype=np.float32)
+    obs = env.reset()
+    rewards, successes, observations, taken = [], [], [obs], []
+    for t in range(N_STEPS):
+        if actions is None:
+            action = policy.get_action(obs)
+            action = action if use_gripper else action[:3]
+        else:
+            action = actions[t]
+        obs, reward, done, info = env.step(action)
+        rewards.append(reward)
+        successes.append(bool(info['success']))
+        observations.append(obs)
+        taken.append(action)
+        if done:
+            break
+    return np.array(rewards), np.array(successes), np.array(observations), taken
+
+
+@pytest.mark.parametrize('use_gripper', [True, False])
+def test_spaces_are_float32(use_gripper):
+    env = make_dooropen_env(10, 0, use_gripper=use_gripper, dtype=np.float32)
+    assert env.observation_space.dtype == np.float32
+    assert env.action_space.dtype == np.float32
+    assert env.reset().dtype == np.float32
+
+
+@pytest.mark.parametrize('use_gripper', [True, False])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_rewards_and_success_unchanged(seed, use_gripper):
+    # the float64 env replays the float32 actions, which both represent exactly
+    r64, s64, obs64, actions = rollout(np.float64, seed, use_gripper)
+    r32, s32, obs32, _ = rollout(np.float32, seed, use_gripper, actions=actions)
+
+    assert r32.dtype == obs32.dtype == np.float32
+    np.testing.assert_array_equal(s32, s64)
+    np.testing.assert_allclose(r32, r64, rtol=REWARD_RTOL)
+    np.testing.assert_allclose(obs32, obs64, rtol=1e-6, atol=1e-7)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('gym')
+
+from metaworld_door_open.monitoring import EpisodeStats
+from metaworld_door_open.spec import INFO_DTYPE
+
+
+def records(rng, n):
+    infos = np.zeros(n, dtype=INFO_DTYPE)
+    for key in INFO_DTYPE.names:
+        infos[key] = rng.uniform(size=n) > 0.5
+    return infos
+
+
+@pytest.mark.parametrize('as_dicts', [False, True])
+def test_subset_updates_match_per_env_updates(as_dicts):
+    rng = np.random.default_rng(0)
+    batched, reference = EpisodeStats(num_envs=4), EpisodeStats(num_envs=4)
+    for step in range(20):
+        env_ids = np.flatnonzero(rng.uniform(size=4) > 0.4)
+        infos = records(rng, len(env_ids))
+        dones = rng.uniform(size=len(env_ids)) > 0.8
+        for env_id, info, done in zip(env_ids, infos, dones):
+            reference.update(env_id, info, done)
+        if as_dicts:
+            infos = [{key: info[key] for key in INFO_DTYPE.names} for info in infos]
+        batched.update_batch(infos, dones, env_ids=env_ids)
+
+    expected = reference.snapshot()
+    for name, value in batched.snapshot().items():
+        np.testing.assert_array_equal(value, expected[name], err_msg=name)
+
+
+def test_update_batch_defaults_to_all_envs():
+    infos = np.zeros(3, dtype=INFO_DTYPE)
+    infos['success'] = [1, 0, 1]
+    stats = EpisodeStats(num_envs=3)
+    stats.update_batch(infos, [False, False, True])
+    np.testing.assert_array_equal(stats.length, [1, 1, 0])
+    np.testing.assert_array_equal(stats.first_success, [0, -1, -1])
+    np.testing.assert_array_equal(stats.success_episodes, [0, 0, 1])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+gym = pytest.importorskip('gym')
+
+from metaworld_door_open.wrappers import PixelObservationWrapper
+
+
+class CountingEnv(gym.Env):
+    """Renders frames whose pixels hold the number of steps taken, plus the
+    row index in the red channel to check the vertical flip"""
+    observation_space = gym.spaces.Box(-1., 1., (1,))
+    action_space = gym.spaces.Box(-1., 1., (1,))
+
+    def __init__(self):
+        self.t = 0
+
+    def reset(self):
+        self.t = 0
+        return np.zeros(1)
+
+    def step(self, action):
+        self.t += 1
+        return np.zeros(1), 0., False, {}
+
+    def render(self, offscreen=False, resolution=(640, 480), camera_name=None):
+        width, height = resolution
+        image = np.full((height, width, 3), self.t, dtype=np.uint8)
+        image[..., 0] = np.arange(height)[::-1, None]
+        return image
+
+
+def test_frame_stack_is_ring_buffer_view():
+    env = PixelObservationWrapper(CountingEnv(), resolution=(6, 5), num_frames=3)
+    obs = env.reset()
+    assert obs.shape == (3, 5, 6, 3) and obs.dtype == np.uint8
+    np.testing.assert_array_equal(obs[..., 1], 0)
+    for t in range(1, 8):
+        obs, _, _, _ = env.step(np.zeros(1))
+        expected = [max(t - 2, 0), max(t - 1, 0), t]
+        np.testing.assert_array_equal(obs[:, 0, 0, 1], expected)
+        # rows come back top row first
+        np.testing.assert_array_equal(obs[0, :, 0, 0], np.arange(5))
+        assert np.shares_memory(obs, env._frames)
+
+
+def test_grayscale_weights():
+    env = PixelObservationWrapper(CountingEnv(), resolution=(4, 4), grayscale=True,
+                                  num_frames=2)
+    env.reset()
+    obs, _, _, _ = env.step(np.zeros(1))
+    assert obs.shape == (2, 4, 4)
+    red = np.arange(4)[:, None]
+    expected = (77 * red + 150 * 1 + 29 * 1) >> 8
+    np.testing.assert_array_equal(obs[-1], np.broadcast_to(expected, (4, 4)))
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from metaworld_door_open import rendering
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_with_backend(code, backend):
+    env = dict(os.environ, DOOROPEN_RENDER_BACKEND=backend)
+    env.pop('MUJOCO_PY_FORCE_CPU', None)
+    out = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return out.strip().splitlines()[-1]
+
+
+def test_env_var_applied_on_package_import():
+    code = ('import os, sys\n'
+            'import metaworld_door_open\n'
+            'assert "mujoco_py" not in sys.modules\n'
+            'print(os.environ.get("MUJOCO_PY_FORCE_CPU"))')
+    assert run_with_backend(code, 'osmesa') == '1'
+
+
+def test_env_var_selects_backend_before_mujoco_py_is_loaded():
+    pytest.importorskip('mujoco_py')
+    code = ('from metaworld_door_open import make_dooropen_env\n'
+            'from metaworld_door_open.rendering import active_backend\n'
+            'print(active_backend())')
+    assert run_with_backend(code, 'osmesa') in ('osmesa', 'glfw')
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        rendering.select_backend('vulkan')
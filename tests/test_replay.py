@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('gym')
+
+from metaworld_door_open.replay import (ActionLogWriter, EpisodeRecord,
+                                        read_action_log)
+
+
+def test_log_round_trip(tmp_path):
+    path = tmp_path / 'actions.log'
+    config = {'max_episode_length': 20, 'seed': 3}
+    writer = ActionLogWriter(path, config)
+    rng = np.random.default_rng(0)
+    records = [EpisodeRecord(rng.normal(size=6), rng.normal(size=(n, 4)).astype(np.float32),
+                             rng.integers(0, 2 ** 32, n // 5 + 1, dtype=np.uint32), 5,
+                             exception_step=step)
+               for n, step in ((20, -1), (7, 4), (0, -1))]
+    for record in records:
+        writer.write(record)
+
+    read_config, read_records = read_action_log(path)
+    assert read_config == config
+    assert len(read_records) == len(records)
+    for got, want in zip(read_records, records):
+        np.testing.assert_array_equal(got.rand_vec, want.rand_vec)
+        np.testing.assert_array_equal(got.actions, want.actions)
+        np.testing.assert_array_equal(got.checksums, want.checksums)
+        assert got.checksum_every == want.checksum_every
+        assert got.exception_step == want.exception_step
+
+
+def test_writer_does_not_overwrite(tmp_path):
+    path = tmp_path / 'actions.log'
+    path.write_bytes(b'keep')
+    with pytest.raises(FileExistsError):
+        ActionLogWriter(path, {})
+    assert path.read_bytes() == b'keep'
+    ActionLogWriter(path, {}, overwrite=True)
+    assert read_action_log(path) == ({}, [])
+
+
+def test_recorded_episodes_replay_exactly(tmp_path):
+    pytest.importorskip('mujoco_py')
+    from metaworld_door_open import make_dooropen_env
+    from metaworld_door_open.replay import find_divergence, make_replay_env
+
+    path = tmp_path / 'actions.log'
+    env = make_dooropen_env(30, 0, action_log=str(path))
+    rng = np.random.default_rng(0)
+    for _ in range(2):
+        env.reset()
+        for _ in range(25):
+            env.step(rng.uniform(-1., 1., size=4))
+    env.close()
+
+    config, records = read_action_log(path)
+    assert [len(record) for record in records] == [25, 25]
+    replay_env = make_replay_env(config)
+    for record in records:
+        assert find_divergence(replay_env, record) == (None, -1)
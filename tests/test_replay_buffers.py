@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from metaworld_door_open.buffers import CURR, GOAL, PREV, DedupReplayBuffer
+
+
+def make_episodes(rng, n_envs, lengths):
+    """Observations laid out like `SawyerXYZEnv._get_obs`, per env a list of
+    episodes of (observations, actions, rewards)"""
+    episodes = []
+    for env_id in range(n_envs):
+        env_episodes = []
+        for length in lengths:
+            curr = rng.normal(size=(length + 2, 18))
+            goal = rng.normal(size=3)
+            obs = np.concatenate([curr[1:], curr[:-1], np.tile(goal, (length + 1, 1))],
+                                 axis=1)
+            env_episodes.append((obs, rng.normal(size=(length, 4)), rng.normal(size=length)))
+        episodes.append(env_episodes)
+    return episodes
+
+
+def fill(buffer, episodes):
+    """Writes the episodes of all envs interleaved step by step and returns
+    the expected transitions keyed by (reward, action) bytes"""
+    expected = {}
+    n_envs = len(episodes)
+    for e in range(len(episodes[0])):
+        for env_id in range(n_envs):
+            buffer.add_reset(episodes[env_id][e][0][0], env_id=env_id)
+        length = len(episodes[0][e][1])
+        for t in range(length):
+            for env_id in range(n_envs):
+                obs, actions, rewards = episodes[env_id][e]
+                done = t == length - 1
+                buffer.add(actions[t], rewards[t], obs[t + 1], done, env_id=env_id)
+                expected[actions[t].astype(np.float32).tobytes()] = \
+                    (obs[t], obs[t + 1], rewards[t], done)
+    return expected
+
+
+@pytest.mark.parametrize('capacity', [10000, 97])
+def test_sampled_transitions_are_rebuilt_exactly(capacity):
+    rng = np.random.default_rng(0)
+    buffer = DedupReplayBuffer(capacity)
+    expected = fill(buffer, make_episodes(rng, 3, [20, 7, 31]))
+    obs, actions, rewards, next_obs, dones = buffer.sample(256, rng)
+    assert obs.shape == next_obs.shape == (256, 39)
+    for i in range(256):
+        want_obs, want_next, want_reward, want_done = expected[actions[i].tobytes()]
+        np.testing.assert_array_equal(obs[i], want_obs.astype(np.float32))
+        np.testing.assert_array_equal(next_obs[i], want_next.astype(np.float32))
+        assert rewards[i] == np.float32(want_reward)
+        assert dones[i] == want_done
+    np.testing.assert_array_equal(obs[:, GOAL], next_obs[:, GOAL])
+    np.testing.assert_array_equal(obs[:, CURR], next_obs[:, PREV])
+
+
+def test_sample_without_complete_transition():
+    rng = np.random.default_rng(1)
+    buffer = DedupReplayBuffer(16)
+    with pytest.raises(ValueError):
+        buffer.sample(4, rng)
+    buffer.add_reset(np.zeros(39))
+    with pytest.raises(ValueError):
+        buffer.sample(4, rng)
+    buffer.add(np.ones(4), 1., np.ones(39), False)
+    _, actions, _, _, _ = buffer.sample(4, rng)
+    np.testing.assert_array_equal(actions, 1.)
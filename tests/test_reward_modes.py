@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('mujoco_py')
+
+from metaworld_door_open import make_dooropen_env
+
+
+@pytest.mark.parametrize('use_gripper', [True, False])
+def test_mutating_obs_leaves_lazy_reward_unchanged(use_gripper):
+    eager = make_dooropen_env(10, 0, use_gripper=use_gripper)
+    lazy = make_dooropen_env(10, 0, use_gripper=use_gripper, reward_mode='lazy')
+    eager.reset()
+    lazy.reset()
+    action = np.full(eager.action_space.shape, 0.5)
+    _, reward, _, _ = eager.step(action)
+    obs, _, _, _ = lazy.step(action)
+    obs[:] = 100.
+    assert lazy.unwrapped.last_reward == reward
+
+
+def test_lazy_step_after_sim_exception_returns_no_info():
+    env = make_dooropen_env(10, 0, reward_mode='lazy')
+    env.reset()
+    action = np.zeros(env.action_space.shape)
+    env.step(action)
+    # what `do_simulation` records when mujoco raises
+    env.unwrapped._did_see_sim_exception = True
+    for _, reward, _, info in (env.step(action), env.step_n([action] * 2)[:4]):
+        assert np.isnan(reward)
+        assert info is None
+        assert env.unwrapped.last_reward == 0.
+        assert not env.unwrapped.last_info['success']
+
+
+@pytest.mark.parametrize('info_mode', ['dict', 'record'])
+def test_step_n_flags_sim_errors(info_mode):
+    env = make_dooropen_env(10, 0, info_mode=info_mode)
+    env.reset()
+    action = np.zeros(env.action_space.shape)
+    obs, _, _, info, _ = env.step_n([action])
+    assert not env.unwrapped.sim_error
+    assert 'sim_error' not in (info if info_mode == 'dict' else info.dtype.names)
+    env.unwrapped._did_see_sim_exception = True
+    stale, reward, _, info, _ = env.step_n([action] * 2)
+    np.testing.assert_array_equal(stale, obs)
+    assert reward == 0.
+    assert env.unwrapped.sim_error
+    if info_mode == 'dict':
+        assert info['sim_error']
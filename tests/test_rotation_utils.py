@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from metaworld_door_open.sawyer_xyz.rotation_utils import mat2quat
+
+
+def random_rotations(rng, n):
+    q, r = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    q *= np.sign(np.diagonal(r, axis1=1, axis2=2))[:, None, :]
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+def test_matches_scipy():
+    rotation = pytest.importorskip('scipy.spatial.transform').Rotation
+    rng = np.random.default_rng(0)
+    mats = random_rotations(rng, 500)
+    # each branch of the algorithm: near identity and half turns about x, y, z
+    mats = np.concatenate([mats, np.eye(3)[None],
+                           np.diag([1., -1., -1.])[None],
+                           np.diag([-1., 1., -1.])[None],
+                           np.diag([-1., -1., 1.])[None]])
+    np.testing.assert_allclose(mat2quat(mats), rotation.from_matrix(mats).as_quat(),
+                               atol=1e-12)
+
+
+def test_batch_shape_and_known_rotation():
+    # 90 degrees about z
+    mat = np.array([[0., -1., 0.], [1., 0., 0.], [0., 0., 1.]])
+    expected = np.array([0., 0., np.sqrt(0.5), np.sqrt(0.5)])
+    np.testing.assert_allclose(mat2quat(mat), expected, atol=1e-12)
+    assert mat2quat(np.tile(mat, (2, 5, 1, 1))).shape == (2, 5, 4)
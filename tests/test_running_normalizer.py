@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from metaworld_door_open.spec import OBS_SPECS, Q, VecQuantSpec, quants_to_sizes
+
+
+@pytest.fixture
+def spec():
+    return VecQuantSpec.from_desc(OBS_SPECS['default'], quants_to_sizes)
+
+
+def observations(rng, n, spec):
+    return rng.normal(3., 2., size=(n, len(spec))) * rng.uniform(0.1, 10., len(spec))
+
+
+def test_matches_numpy(spec):
+    rng = np.random.default_rng(0)
+    data = observations(rng, 1000, spec)
+    normalizer = spec.make_running_normalizer()
+    for batch in np.array_split(data, [1, 10, 300, 301, 700]):
+        normalizer.update(batch)
+    for q in normalizer.quants:
+        mean, var = normalizer.stats(q)
+        np.testing.assert_allclose(mean, data[:, spec[q]].mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(var, data[:, spec[q]].var(axis=0), rtol=1e-10)
+
+
+def test_merge_equals_single_stream(spec):
+    rng = np.random.default_rng(1)
+    data = observations(rng, 900, spec)
+    single = spec.make_running_normalizer()
+    single.update(data)
+
+    workers = [spec.make_running_normalizer() for _ in range(3)]
+    for worker, chunk in zip(workers, np.array_split(data, [250, 251])):
+        worker.update(chunk)
+    merged = spec.make_running_normalizer()
+    merged.merge(spec.make_running_normalizer())  # empty merges are no-ops
+    for worker in workers:
+        merged.merge(worker)
+
+    assert merged.count == single.count == 900
+    np.testing.assert_allclose(merged.mean, single.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged.m2, single.m2, rtol=1e-10)
+
+
+def test_unused_is_skipped(spec):
+    rng = np.random.default_rng(2)
+    normalizer = spec.make_running_normalizer()
+    assert Q.unused not in normalizer.quants
+    assert len(normalizer.mean) == len(spec) - quants_to_sizes[Q.unused]
+    data = observations(rng, 50, spec)
+    normalizer.update(data)
+    out = normalizer.normalize(data)
+    np.testing.assert_array_equal(out[:, spec[Q.unused]], data[:, spec[Q.unused]])
+    np.testing.assert_allclose(out[:, spec[Q.eef_pos]].mean(axis=0), 0., atol=1e-10)
+    np.testing.assert_allclose(out[:, spec[Q.eef_pos]].std(axis=0), 1., rtol=1e-6)
+
+
+def test_serialization_round_trip(spec):
+    normalizer = spec.make_running_normalizer()
+    normalizer.update(observations(np.random.default_rng(3), 20, spec))
+    data = normalizer.to_bytes()
+    assert len(data) == 8 * (1 + 2 * len(normalizer.mean))
+    restored = type(normalizer).from_bytes(spec, data)
+    assert restored.count == normalizer.count
+    np.testing.assert_array_equal(restored.mean, normalizer.mean)
+    np.testing.assert_array_equal(restored.m2, normalizer.m2)
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pytest
+
+from metaworld_door_open import scenes
+from metaworld_door_open.scenes import (ASSETS_DIR, build_multi_scene, copy_prefix,
+                                        iter_geoms, load_flat_scene, multi_scene_offsets,
+                                        scene_files, scene_path)
+
+
+def test_scene_files_cover_includes_and_assets():
+    files = scene_files(scene_path('default'))
+    names = {os.path.relpath(f, ASSETS_DIR) for f in files}
+    assert {'sawyer_door_pull.xml', 'basic_scene.xml', 'xyz_base.xml',
+            'doorlockB.xml', 'textures/wood2.png'} <= names
+    assert any(name.startswith('meshes/') for name in names)
+    assert all(os.path.isfile(f) for f in files)
+
+
+def collide(a, b):
+    return bool(int(a.get('contype')) & int(b.get('conaffinity'))) or \
+        bool(int(b.get('contype')) & int(a.get('conaffinity')))
+
+
+def test_multi_scene_copies_robot_door_and_table():
+    base = load_flat_scene(scene_path('default'))
+    base_bodies = [body.get('name') for worldbody in base.findall('worldbody')
+                   for body in worldbody.findall('body')]
+    assert 'tablelink' in base_bodies
+
+    root = build_multi_scene(3)
+    worldbodies = root.findall('worldbody')
+    assert all(not worldbody.findall('body') for worldbody in worldbodies[:-1])
+    bodies = {body.get('name'): body for body in worldbodies[-1].findall('body')}
+    assert set(bodies) == {copy_prefix(k) + name for k in range(3) for name in base_bodies}
+    offsets = multi_scene_offsets(3)
+    for k in range(3):
+        pos = [float(x) for x in bodies[copy_prefix(k) + 'tablelink'].get('pos').split()]
+        assert pos == [0. + offsets[k][0], .6 + offsets[k][1], -2.]
+    # the floor plane stays shared
+    assert [geom.get('name') for worldbody in worldbodies
+            for geom in worldbody.findall('geom')] == ['floor']
+
+
+def test_multi_scene_collision_groups():
+    root = build_multi_scene(2)
+    copies = [[], []]
+    for body in root.findall('worldbody')[-1].findall('body'):
+        k = 0 if body.get('name').startswith(copy_prefix(0)) else 1
+        copies[k].extend(body.iter('geom'))
+    assert not any(collide(a, b) for a in copies[0] for b in copies[1])
+    # both copies still collide with the shared floor
+    floor = root.find('worldbody/geom')
+    touching_floor = [sum(collide(geom, floor) for geom in geoms) for geoms in copies]
+    assert touching_floor[0] == touching_floor[1] > 0
+
+
+def test_multi_scene_file_is_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenes, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(scenes, '_multi_scene_paths', {})
+    path = scenes.multi_scene_path(2)
+    assert path.startswith(tmp_path.as_posix())
+    mtime = os.stat(path).st_mtime_ns
+
+    monkeypatch.setattr(scenes, '_multi_scene_paths', {})
+    assert scenes.multi_scene_path(2) == path
+    assert os.stat(path).st_mtime_ns == mtime
+    assert scenes.multi_scene_path(3) != path
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith('.tmp')]
+
+    files = scene_files(path)
+    assert len(files) > 1 and all(os.path.isabs(f) and os.path.isfile(f) for f in files[1:])
+
+
+def test_door_open_rewards_match_env():
+    pytest.importorskip('mujoco_py')
+    from metaworld_door_open.batched import door_open_rewards
+    from metaworld_door_open.sawyer_xyz import reward_utils
+    from metaworld_door_open.sawyer_xyz.sawyer_door_v2 import SawyerDoorEnvV2
+
+    rng = np.random.default_rng(0)
+    n = 200
+    obs = rng.uniform(-0.2, 0.2, size=(n, 39))
+    obs[:, 4:7] += [0.05, 0.85, 0.15]
+    # hands from far away to right at the handle
+    obs[:, :3] = obs[:, 4:7] + rng.uniform(-1., 1., size=(n, 1)) * rng.uniform(0., 0.5, (n, 3))
+    theta = rng.uniform(-np.pi / 2, 0., n)
+    actions = rng.uniform(-1.2, 1.2, size=(n, 4))
+    target_x = obs[:, 4] + rng.uniform(-0.2, 0.2, n)
+
+    reward, grab, ready, opened, success = door_open_rewards(obs, theta, actions, target_x)
+    for i in range(n):
+        want_grab = SawyerDoorEnvV2._reward_grab_effort(actions[i])
+        want_ready, want_opened = SawyerDoorEnvV2._reward_pos(obs[i], theta[i])
+        want = 2.0 * reward_utils.hamacher_product(want_ready, want_grab) + 8.0 * want_opened
+        want_success = abs(obs[i, 4] - target_x[i]) <= 0.08
+        if want_success:
+            want = 10.0
+        assert success[i] == want_success
+        np.testing.assert_allclose([reward[i], grab[i], ready[i], opened[i]],
+                                   [want, want_grab, want_ready, want_opened], rtol=1e-12)
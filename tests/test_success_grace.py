@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+gym = pytest.importorskip('gym')
+
+from metaworld_door_open.wrappers import EpisodeLengthWrapper
+
+
+class SucceedsAtEnv(gym.Env):
+    """Reports success from step `success_step` on"""
+    observation_space = gym.spaces.Box(-1., 1., (1,))
+    action_space = gym.spaces.Box(-1., 1., (1,))
+
+    def __init__(self, success_step):
+        self.success_step = success_step
+        self.t = 0
+
+    def reset(self):
+        self.t = 0
+        return np.zeros(1)
+
+    def step(self, action):
+        self.t += 1
+        info = {'success': float(self.t >= self.success_step)}
+        return np.full(1, self.t), 0., False, info
+
+    def step_n(self, actions, returns='last', obs_out=None, reward_out=None,
+               until_success=False):
+        m = 0
+        for action in actions:
+            observation, reward, done, info = self.step(action)
+            m += 1
+            if until_success and info['success']:
+                break
+        return observation, reward, done, info, m
+
+
+def run_steps(env):
+    env.reset()
+    length = 0
+    done = False
+    while not done:
+        _, _, done, info = env.step(np.zeros(1))
+        length += 1
+    return length, info
+
+
+@pytest.mark.parametrize('success_step, grace, expected', [
+    (5, 0, 5), (5, 3, 8), (18, 5, 20), (30, 5, 20)])
+def test_episode_ends_after_grace(success_step, grace, expected):
+    env = EpisodeLengthWrapper(SucceedsAtEnv(success_step), max_length=20,
+                               success_grace=grace)
+    length, info = run_steps(env)
+    assert length == expected
+    assert env.steps_saved == info['steps_saved'] == 20 - expected
+    run_steps(env)
+    assert env.total_steps_saved == 2 * (20 - expected)
+
+
+def test_without_grace_runs_to_max_length():
+    env = EpisodeLengthWrapper(SucceedsAtEnv(1), max_length=20)
+    assert run_steps(env)[0] == 20
+    assert env.steps_saved == 0
+
+
+@pytest.mark.parametrize('chunk', [1, 3, 7, 50])
+@pytest.mark.parametrize('success_step, grace', [(5, 0), (5, 3), (18, 5), (30, 5)])
+def test_step_n_matches_step(success_step, grace, chunk):
+    reference = EpisodeLengthWrapper(SucceedsAtEnv(success_step), max_length=20,
+                                     success_grace=grace)
+    length, _ = run_steps(reference)
+
+    env = EpisodeLengthWrapper(SucceedsAtEnv(success_step), max_length=20,
+                               success_grace=grace)
+    env.reset()
+    total, done = 0, False
+    while not done:
+        observation, _, done, _, n = env.step_n(np.zeros((chunk, 1)))
+        total += n
+    assert total == length == observation[0]
+    assert env.steps_saved == reference.steps_saved
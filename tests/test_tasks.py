@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('mujoco_py')
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.tasks import TaskPool
+
+
+SEEDS = [0, 1, 7, 123]
+
+
+def test_from_seeds_matches_env_door_positions():
+    pool = TaskPool.from_seeds(SEEDS)
+    for task_id, seed in enumerate(SEEDS):
+        env = make_dooropen_env(10, seed)
+        env.reset()
+        np.testing.assert_array_equal(pool[task_id], env.unwrapped._last_rand_vec)
+
+
+def test_apply_switches_door_position():
+    pool = TaskPool.from_seeds(SEEDS)
+    env = make_dooropen_env(10, 0)
+    pool.apply(env, 2)
+    env.reset()
+    np.testing.assert_array_equal(env.unwrapped._last_rand_vec, pool[2])
+
+
+def test_shards_partition_the_table(tmp_path):
+    pool = TaskPool.from_seeds(range(10))
+    shards = [pool.shard(i, 3) for i in range(3)]
+    assert sum(len(shard) for shard in shards) == len(pool)
+    np.testing.assert_array_equal(
+        np.sort(np.concatenate([shard.seeds for shard in shards])), np.arange(10))
+
+    pool.save(tmp_path / 'tasks.npz')
+    loaded = TaskPool.load(tmp_path / 'tasks.npz')
+    np.testing.assert_array_equal(loaded.rand_vecs, pool.rand_vecs)
+    np.testing.assert_array_equal(loaded.seeds, pool.seeds)
+
+
+@pytest.mark.parametrize('double_buffer', [False, True])
+def test_descriptor_draws_from_its_shard(double_buffer):
+    from metaworld_door_open.vector import EnvDescriptor
+
+    pool = TaskPool.from_seeds(range(6))
+    descriptor = EnvDescriptor(3, 10, task_pool=pool, task_shard=(1, 3),
+                               double_buffer=double_buffer)
+    assert len(descriptor.task_pool) == 2
+    env = descriptor.build()
+    try:
+        for _ in range(6):
+            env.reset()
+            rand_vec = env.unwrapped._last_rand_vec
+            assert any(np.array_equal(rand_vec, pool[i]) for i in (1, 4))
+    finally:
+        env.close()
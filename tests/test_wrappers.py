@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+gym = pytest.importorskip('gym')
+
+from metaworld_door_open.wrappers import DoorOpenNoGripperControl, DoorOpenNoGripperObs
+
+
+class GripperEnv(gym.Env):
+    observation_space = gym.spaces.Box(-1., 1., (39,), dtype=np.float64)
+    action_space = gym.spaces.Box(-1., 1., (4,), dtype=np.float64)
+
+    def __init__(self, observe=True, control=True):
+        self._observe_gripper = observe
+        self._control_gripper = control
+
+
+@pytest.mark.parametrize('shim, configured', [
+    (DoorOpenNoGripperObs, dict(observe=False)),
+    (DoorOpenNoGripperControl, dict(control=False)),
+])
+def test_shims_need_a_configured_env(shim, configured):
+    with pytest.raises(ValueError, match='configure_gripper'):
+        shim(GripperEnv())
+    env = GripperEnv(**configured)
+    shim(env)
+    assert (env._observe_gripper, env._control_gripper) == \
+        (configured.get('observe', True), configured.get('control', True))
@@ -0,0 +1,201 @@
+"""
+Builds the 'lite' scene: every mesh geom that takes part in collisions gets a
+simplified collision proxy, the original mesh is kept for rendering only.
+
+    python -m tools.build_collision_meshes [--mode hull|box] [--max-vertices 48]
+
+In `hull` mode the proxy is the convex hull of the mesh decimated to at most
+`--max-vertices` vertices (MuJoCo collides meshes through their convex hull
+anyway), in `box` mode it is the mesh's bounding box. Door, handle and gripper
+pads are primitives in the original scene already and are kept as they are.
+"""
+import argparse
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from scipy.spatial import ConvexHull
+
+from metaworld_door_open.scenes import ASSETS_DIR, SCENES, load_flat_scene, \
+    write_scene, iter_geoms, can_collide
+
+
+COLLISION_MESH_DIR = 'meshes/collision'
+
+# geom attributes that define contact behaviour and are copied to the proxy
+_CONTACT_ATTRS = ('contype', 'conaffinity', 'condim', 'friction', 'solref',
+                  'solimp', 'solmix', 'margin', 'gap', 'priority')
+
+_STL_DTYPE = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)),
+                       ('attr', '<u2')])
+
+
+def read_stl(path):
+    """Returns the (n_faces, 3, 3) triangles of a binary STL file"""
+    with open(path, 'rb') as f:
+        f.seek(80)
+        n_faces = int(np.fromfile(f, dtype='<u4', count=1)[0])
+        faces = np.fromfile(f, dtype=_STL_DTYPE, count=n_faces)
+    return faces['vertices'].astype(np.float64)
+
+
+def write_stl(path, triangles):
+    faces = np.zeros(len(triangles), dtype=_STL_DTYPE)
+    faces['vertices'] = triangles
+    normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                       triangles[:, 2] - triangles[:, 0])
+    faces['normal'] = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+    with open(path, 'wb') as f:
+        f.write(b'collision proxy'.ljust(80, b' '))
+        np.array([len(faces)], dtype='<u4').tofile(f)
+        faces.tofile(f)
+
+
+def decimate_hull(vertices, max_vertices):
+    """Convex hull with at most `max_vertices` vertices.
+
+    Hull vertices are clustered on a grid that is coarsened until few enough
+    clusters remain; each cluster is represented by its vertex farthest from
+    the centroid, so the proxy shrinks as little as possible.
+    """
+    points = vertices[ConvexHull(vertices).vertices]
+    centroid = points.mean(axis=0)
+    extent = np.ptp(points, axis=0).max()
+    radius = np.linalg.norm(points - centroid, axis=1)
+    resolution = 64
+    while len(points) > max_vertices and resolution > 1:
+        cells = np.floor((points - points.min(axis=0)) / (extent / resolution))
+        _, cluster = np.unique(cells, axis=0, return_inverse=True)
+        cluster = cluster.ravel()
+        # farthest point of every cluster
+        order = np.lexsort((-radius, cluster))
+        first = np.r_[True, cluster[order][1:] != cluster[order][:-1]]
+        keep = order[first]
+        points, radius = points[keep], radius[keep]
+        resolution //= 2
+
+    hull = ConvexHull(points)
+    triangles = points[hull.simplices]
+    # orient all faces outwards, MuJoCo needs a consistent winding for volume
+    normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                       triangles[:, 2] - triangles[:, 0])
+    flip = np.einsum('ij,ij->i', normals, hull.equations[:, :3]) < 0
+    triangles[flip] = triangles[flip][:, [0, 2, 1]]
+    return triangles
+
+
+def _parse_vec(text, default):
+    return np.array([float(x) for x in text.split()]) if text else np.array(default)
+
+
+def _quat_rotate(quat, vec):
+    w, u = quat[0], quat[1:]
+    return vec + 2 * np.cross(u, np.cross(u, vec) + w * vec)
+
+
+def _quat_mul(a, b):
+    w1, u1, w2, u2 = a[0], a[1:], b[0], b[1:]
+    return np.r_[w1 * w2 - u1 @ u2, w1 * u2 + w2 * u1 + np.cross(u1, u2)]
+
+
+def _axis_angle_quat(axis, angle):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    return np.r_[np.cos(angle / 2), np.sin(angle / 2) * axis]
+
+
+def compiler_settings(root):
+    """`angle` and `eulerseq` of the scene's `<compiler>` elements, MuJoCo's
+    defaults where unset"""
+    settings = {'angle': 'degree', 'eulerseq': 'xyz'}
+    for compiler in root.iter('compiler'):
+        settings.update((k, compiler.get(k)) for k in settings if compiler.get(k))
+    return settings
+
+
+def geom_quat(geom, compiler):
+    """Orientation (w, x, y, z) of a geom given by `quat`, `euler` or
+    `axisangle`, converted like the MuJoCo compiler does"""
+    scale = np.pi / 180. if compiler['angle'] == 'degree' else 1.
+    if geom.get('euler'):
+        quat = np.array([1., 0., 0., 0.])
+        for axis, angle in zip(compiler['eulerseq'], _parse_vec(geom.get('euler'), None) * scale):
+            rotation = _axis_angle_quat(np.eye(3)['xyz'.index(axis.lower())], angle)
+            # lowercase axes move with the frame, uppercase ones are fixed
+            quat = _quat_mul(quat, rotation) if axis.islower() else _quat_mul(rotation, quat)
+        return quat
+    if geom.get('axisangle'):
+        values = _parse_vec(geom.get('axisangle'), None)
+        return _axis_angle_quat(values[:3], values[3] * scale)
+    for attr in ('xyaxes', 'zaxis'):
+        if geom.get(attr):
+            raise ValueError('Mesh geom {!r} is oriented with {!r}, use quat, euler '
+                             'or axisangle'.format(geom.get('name', geom.get('mesh')), attr))
+    return _parse_vec(geom.get('quat'), [1., 0., 0., 0.])
+
+
+def build(mode='hull', max_vertices=48):
+    scene_file, _ = SCENES['default']
+    root = load_flat_scene(ASSETS_DIR / scene_file)
+    meshes = {m.get('name'): m for m in root.iter('mesh') if m.get('file')}
+    compiler = compiler_settings(root)
+    (ASSETS_DIR / COLLISION_MESH_DIR).mkdir(parents=True, exist_ok=True)
+    asset = ET.Element('asset')
+    root.insert(0, asset)
+
+    for geom, body, attrs in list(iter_geoms(root)):
+        if attrs['type'] != 'mesh' or not can_collide(attrs):
+            continue
+        mesh = meshes[attrs['mesh']]
+        scale = _parse_vec(mesh.get('scale'), [1., 1., 1.])
+        vertices = read_stl(ASSETS_DIR / mesh.get('file')).reshape(-1, 3) * scale
+        vertices = np.unique(vertices, axis=0)
+
+        proxy = ET.Element('geom', {k: attrs[k] for k in _CONTACT_ATTRS if k in attrs})
+        proxy.set('group', '4')
+        proxy.set('density', '0')
+        proxy.set('rgba', '0.3 0.3 1.0 0.5')
+        pos = _parse_vec(geom.get('pos'), [0., 0., 0.])
+        quat = geom_quat(geom, compiler)
+        if mode == 'hull':
+            name = '{}_collision'.format(mesh.get('name'))
+            file_name = '{}/{}.stl'.format(COLLISION_MESH_DIR, mesh.get('name'))
+            triangles = decimate_hull(vertices, max_vertices)
+            write_stl(ASSETS_DIR / file_name, triangles)
+            ET.SubElement(asset, 'mesh', {'name': name, 'file': file_name})
+            proxy.set('type', 'mesh')
+            proxy.set('mesh', name)
+            proxy.set('pos', ' '.join(map(repr, pos)))
+            proxy.set('quat', ' '.join(map(repr, quat)))
+            n_vertices = len(np.unique(triangles.reshape(-1, 3), axis=0))
+        elif mode == 'box':
+            low, high = vertices.min(axis=0), vertices.max(axis=0)
+            proxy.set('type', 'box')
+            proxy.set('size', ' '.join(map(repr, (high - low) / 2)))
+            proxy.set('pos', ' '.join(map(repr, pos + _quat_rotate(quat, (high + low) / 2))))
+            proxy.set('quat', ' '.join(map(repr, quat)))
+            n_vertices = 8
+        else:
+            raise ValueError(mode)
+
+        # the original mesh stays for rendering only
+        geom.set('contype', '0')
+        geom.set('conaffinity', '0')
+        body.insert(list(body).index(geom) + 1, proxy)
+        print('{}: {} -> {} vertices ({})'.format(
+            mesh.get('name'), len(vertices), n_vertices, mode))
+
+    out_path = ASSETS_DIR / SCENES['lite'][0]
+    write_scene(root, out_path)
+    print('wrote', out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('hull', 'box'), default='hull')
+    parser.add_argument('--max-vertices', type=int, default=48)
+    args = parser.parse_args()
+    build(args.mode, args.max_vertices)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Checks that the float32 path only changes the storage type: float32 and
+float64 envs are driven with the same actions and must report the same
+success flags, rewards equal up to the float32 cast and observations equal up
+to float32 rounding. Exits with status 1 on mismatch.
+
+    python -m tools.check_float32 --episodes 5
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+
+def compare_episode(seed, n_steps, use_gripper):
+    env64 = make_dooropen_env(n_steps, seed, use_gripper=use_gripper)
+    env32 = make_dooropen_env(n_steps, seed, use_gripper=use_gripper,
+                              dtype=np.float32)
+    assert env32.observation_space.dtype == env32.action_space.dtype == np.float32
+    # float32 actions are exactly representable in both envs
+    policy = SawyerDoorOpenV2Policy(dtype=np.float32)
+    obs64, obs32 = env64.reset(), env32.reset()
+    mismatches = []
+    for t in range(n_steps):
+        if obs32.dtype != np.float32 or \
+                not np.allclose(obs64, obs32, rtol=1e-6, atol=1e-7):
+            mismatches.append('step {}: observation'.format(t))
+        action = policy.get_action(obs64)
+        if not use_gripper:
+            action = action[:3]
+        obs64, r64, done, info64 = env64.step(action)
+        obs32, r32, _, info32 = env32.step(action)
+        if not isinstance(r32, np.float32) or np.float32(r64) != r32:
+            mismatches.append('step {}: reward {} vs {}'.format(t, r64, r32))
+        if info64['success'] != info32['success']:
+            mismatches.append('step {}: success'.format(t))
+        if done:
+            break
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--episodes', type=int, default=5)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+
+    failed = False
+    for use_gripper in (True, False):
+        for seed in range(args.episodes):
+            mismatches = compare_episode(seed, args.steps, use_gripper)
+            failed = failed or bool(mismatches)
+            print('seed {} use_gripper={}: {}'.format(
+                seed, use_gripper, 'ok' if not mismatches else mismatches[0]))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Builds the 'pruned' scene: collision pairs that never make contact while the
+scripted policy and random actions are run get disabled.
+
+    python -m tools.prune_contacts [--base default] [--scripted 50] [--random 50]
+
+Contacts (including those within margin) are logged after every substep.
+Body pairs that can collide but were never seen touching get an `<exclude>`,
+geoms never seen in any contact get `contype`/`conaffinity` 0 so they leave
+the broad phase altogether. The pruned scene is only faithful for behaviour
+covered by the logged episodes, use `--keep-bodies` to protect bodies whose
+contacts must stay enabled regardless.
+"""
+import argparse
+import itertools
+import warnings
+import xml.etree.ElementTree as ET
+
+import mujoco_py
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+from metaworld_door_open.scenes import ASSETS_DIR, SCENES, scene_path, \
+    load_flat_scene, write_scene, iter_geoms, can_collide
+
+
+def step_logging_contacts(env, action, geom_pairs):
+    """`SawyerXYZEnv.step` without reward, recording contacts per substep.
+    Returns the observation and whether the sim raised, the caller ends the
+    episode then since the state is no longer meaningful"""
+    unwrapped = env.unwrapped
+    sim = unwrapped.sim
+    unwrapped.set_xyz_action(action[:3])
+    sim.data.ctrl[:] = [action[-1], -action[-1]]
+    for _ in range(unwrapped.frame_skip):
+        try:
+            sim.step()
+        except mujoco_py.MujocoException as err:
+            warnings.warn(str(err), category=RuntimeWarning)
+            unwrapped._did_see_sim_exception = True
+            return unwrapped._get_obs(), True
+        for contact in sim.data.contact[:sim.data.ncon]:
+            geom_pairs.add((min(contact.geom1, contact.geom2),
+                            max(contact.geom1, contact.geom2)))
+    unwrapped.curr_path_length += 1
+    return unwrapped._get_obs(), False
+
+
+def log_contacts(base_scene, n_scripted, n_random, n_steps):
+    geom_pairs = set()
+    policy = SawyerDoorOpenV2Policy()
+    for episode in range(n_scripted + n_random):
+        env = make_dooropen_env(n_steps, seed=episode, scene=base_scene)
+        rng = np.random.RandomState(episode)
+        obs = env.reset()
+        for _ in range(n_steps):
+            if episode < n_scripted:
+                action = policy.get_action(obs)
+            else:
+                action = rng.uniform(-1., 1., size=4)
+            obs, failed = step_logging_contacts(env, action, geom_pairs)
+            if failed:
+                break
+    return env.unwrapped.model, geom_pairs
+
+
+def _filtered_by_parent(model, b1, b2):
+    """MuJoCo skips parent-child body pairs (except for the world body)"""
+    p1, p2 = model.body_parentid[b1], model.body_parentid[b2]
+    return (p1 == b2 and b2 != 0) or (p2 == b1 and b1 != 0)
+
+
+def _masks_match(model, g1, g2):
+    return bool(model.geom_contype[g1] & model.geom_conaffinity[g2]) or \
+        bool(model.geom_contype[g2] & model.geom_conaffinity[g1])
+
+
+def build(base_scene='default', n_scripted=50, n_random=50, n_steps=200,
+          keep_bodies=()):
+    model, observed = log_contacts(base_scene, n_scripted, n_random, n_steps)
+
+    root = load_flat_scene(scene_path(base_scene))
+    geoms = list(iter_geoms(root))
+    # the XML traversal has to match model geom ids, double check it
+    assert len(geoms) == model.ngeom, 'Geom order does not match the model'
+    for geom_id, (geom, body, attrs) in enumerate(geoms):
+        assert body.get('name', 'world' if body.tag == 'worldbody' else None) \
+            == model.body_id2name(model.geom_bodyid[geom_id]), \
+            'Geom order does not match the model'
+
+    keep = {model.body_name2id(name) for name in keep_bodies}
+    colliding = [g for g, (_, _, attrs) in enumerate(geoms) if can_collide(attrs)]
+    observed_geoms = {g for pair in observed for g in pair}
+    observed_bodies = {tuple(sorted((model.geom_bodyid[g1], model.geom_bodyid[g2])))
+                       for g1, g2 in observed}
+
+    candidate_bodies = set()
+    for g1, g2 in itertools.combinations(colliding, 2):
+        b1, b2 = sorted((model.geom_bodyid[g1], model.geom_bodyid[g2]))
+        if b1 != b2 and _masks_match(model, g1, g2) \
+                and not _filtered_by_parent(model, b1, b2):
+            candidate_bodies.add((b1, b2))
+
+    excluded = sorted(pair for pair in candidate_bodies - observed_bodies
+                      if not keep.intersection(pair)
+                      and all(model.body_id2name(b) for b in pair))
+    disabled = [g for g in colliding if g not in observed_geoms
+                and model.geom_bodyid[g] not in keep]
+
+    for g in disabled:
+        geoms[g][0].set('contype', '0')
+        geoms[g][0].set('conaffinity', '0')
+    contact = ET.SubElement(root, 'contact')
+    for b1, b2 in excluded:
+        ET.SubElement(contact, 'exclude', {'body1': model.body_id2name(b1),
+                                           'body2': model.body_id2name(b2)})
+    write_scene(root, ASSETS_DIR / SCENES['pruned'][0])
+
+    print('colliding geoms: {}, disabled: {}'.format(len(colliding), len(disabled)))
+    print('candidate body pairs: {}, observed: {}, excluded: {}'.format(
+        len(candidate_bodies), len(candidate_bodies & observed_bodies), len(excluded)))
+    for b1, b2 in sorted(candidate_bodies & observed_bodies):
+        print('  kept', model.body_id2name(b1), '<->', model.body_id2name(b2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', default='default', help='scene to prune')
+    parser.add_argument('--scripted', type=int, default=50,
+                        help='episodes of the scripted policy')
+    parser.add_argument('--random', type=int, default=50,
+                        help='episodes of uniformly random actions')
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--keep-bodies', nargs='*', default=[])
+    args = parser.parse_args()
+    build(args.base, args.scripted, args.random, args.steps, args.keep_bodies)
+
+
+if __name__ == '__main__':
+    main()
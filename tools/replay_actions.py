@@ -0,0 +1,65 @@
+"""
+Replays an action log (`make_dooropen_env(..., action_log=path)`) and checks
+the recorded qpos/qvel checksums. For every episode that diverges or hits a
+sim exception the full sim state of the steps around the problem is dumped to
+`<dump-dir>/episode_<i>.npz`. Exits with status 1 if any episode diverges.
+
+    python -m tools.replay_actions actions.log --dump-dir dumps
+"""
+import argparse
+import os
+import sys
+import time
+
+from metaworld_door_open.replay import (dump_states, find_divergence,
+                                        make_replay_env, read_action_log)
+from metaworld_door_open.reporting import print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log')
+    parser.add_argument('--episode', type=int, default=None,
+                        help='replay only this episode')
+    parser.add_argument('--window', type=int, default=5,
+                        help='steps dumped on each side of the problem')
+    parser.add_argument('--dump-dir', default='.')
+    args = parser.parse_args()
+
+    config, records = read_action_log(args.log)
+    env = make_replay_env(config)
+    episodes = range(len(records)) if args.episode is None else [args.episode]
+
+    rows, diverged = [], False
+    for i in episodes:
+        record = records[i]
+        start = time.perf_counter()
+        divergence, exception_step = find_divergence(env, record)
+        replay_time = time.perf_counter() - start
+
+        if divergence is not None:
+            diverged = True
+            first, last = divergence - record.checksum_every + 1, divergence
+            status = 'diverged in steps {}-{}'.format(max(first, 0), last)
+        elif record.exception_step >= 0 or exception_step >= 0:
+            first = last = max(record.exception_step, exception_step)
+            status = 'sim exception after step {} (recorded {})'.format(
+                exception_step, record.exception_step)
+        else:
+            first = last = None
+            status = 'ok'
+        if first is not None:
+            path = os.path.join(args.dump_dir, 'episode_{}.npz'.format(i))
+            dump_states(env, record, first - args.window, last + args.window, path)
+            status += ', states in ' + path
+        speed = len(record) / replay_time if len(record) else 0.
+        rows.append((i, len(record), '{:.0f}'.format(speed), status))
+
+    print_table(('episode', 'steps', 'steps/s', 'result'), rows)
+    env.close()
+    sys.exit(1 if diverged else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Checks that simulation profiles preserve the door-opening dynamics: the door
+joint angle trajectory under the scripted policy must stay within `--bound`
+radians of the reference profile at every step. Exits with status 1 if any
+profile fails.
+
+    python -m tools.validate_profiles --bound 0.05 [--profiles sparse cg]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from metaworld_door_open import make_dooropen_env, SIM_PROFILES
+from metaworld_door_open.policy import SawyerDoorOpenV2Policy
+
+
+def door_angle_trajectory(profile, seed, n_steps):
+    env = make_dooropen_env(n_steps, seed, sim_profile=profile)
+    policy = SawyerDoorOpenV2Policy()
+    data = env.unwrapped.data
+    obs = env.reset()
+    angles = [data.get_joint_qpos('doorjoint')]
+    for _ in range(n_steps):
+        obs, _, done, _ = env.step(policy.get_action(obs))
+        angles.append(data.get_joint_qpos('doorjoint'))
+        if done:
+            break
+    return np.array(angles)
+
+
+def validate(profiles, reference, seeds, n_steps, bound):
+    """Returns {profile: (max abs door angle error over all seeds, whether it
+    is within `bound`)}"""
+    ref = {seed: door_angle_trajectory(reference, seed, n_steps) for seed in seeds}
+    errors = {}
+    for profile in profiles:
+        error = 0.
+        for seed in seeds:
+            traj = door_angle_trajectory(profile, seed, n_steps)
+            t = min(len(traj), len(ref[seed]))
+            error = max(error, np.abs(traj[:t] - ref[seed][:t]).max())
+        errors[profile] = error, error <= bound
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=None,
+                        help='defaults to all but the reference')
+    parser.add_argument('--reference', default='default')
+    parser.add_argument('--bound', type=float, default=0.05,
+                        help='max door angle error [rad]')
+    parser.add_argument('--episodes', type=int, default=5)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+
+    profiles = args.profiles or [p for p in SIM_PROFILES if p != args.reference]
+    errors = validate(profiles, args.reference, range(args.episodes),
+                      args.steps, args.bound)
+    failed = False
+    for profile, (error, ok) in errors.items():
+        failed = failed or not ok
+        print('{:<16} max door angle error {:.4f} rad  {}'.format(
+            profile, error, 'ok' if ok else 'FAIL'))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()